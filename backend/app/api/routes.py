@@ -1,6 +1,7 @@
 """
 API routes for SlopScan backend
 """
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict, Any
 import re
@@ -10,20 +11,15 @@ from app.models import (
     DownloadRequest, DownloadResponse, RepoStructure,
     CommitsResponse, CommitsCountResponse
 )
-from app.services.github import GitHubService
-from app.services.ai import AIService
+from app.services.github import GitHubService, get_github_service
+from app.services.ai import AIService, get_ai_service
 from app.services.summer_of_making import get_summer_service, SummerOfMakingService
 from app.services.prompts import PromptTemplates
 
 router = APIRouter()
 
-# Dependency injection
-def get_github_service() -> GitHubService:
-    return GitHubService()
-
-def get_ai_service() -> AIService:
-    return AIService()
-
+# Dependency injection: the GitHub and AI services are module singletons
+# so their HTTP connection pools and caches survive across requests
 async def get_summer_of_making_service() -> SummerOfMakingService:
     return await get_summer_service()
 
@@ -139,18 +135,35 @@ async def get_code_features(
             print(f"Using provided file paths for analysis: {len(file_paths)} files")
             selected_files = file_paths
         else:
-            readme_content = await github_service.get_readme_content(owner, repo, branch)
+            # README and tree fetches are independent; overlap them
+            readme_content, structure = await asyncio.gather(
+                github_service.get_readme_content(owner, repo, branch),
+                github_service.get_repo_structure(owner, repo, branch)
+            )
+            readme_analysis = None
+            file_selection = None
+
             if readme_content:
-                readme_analysis = await ai_service.analyze_readme(readme_content, repo_url)
+                # One fused completion covers README analysis and file
+                # selection instead of two sequential round-trips
+                print("Running combined README analysis and file selection")
+                combined = await ai_service.analyze_repo_combined(
+                    readme_content, repo_url, structure, max_files
+                )
+                if "error" not in combined:
+                    readme_analysis = combined["readme_analysis"]
+                    file_selection = combined["file_selection"]
+
+            if file_selection is None:
+                if readme_content:
+                    readme_analysis = await ai_service.analyze_readme(readme_content, repo_url)
+
+                print("Running AI file selection for feature extraction")
+                file_selection = await ai_service.select_files_for_analysis(
+                    readme_analysis=readme_analysis or {},
+                    structure=structure,
+                )
 
-            structure = await github_service.get_repo_structure(owner, repo, branch)
-            
-            print("Running AI file selection for feature extraction")
-            file_selection = await ai_service.select_files_for_analysis(
-                readme_analysis=readme_analysis or {},
-                structure=structure,
-            )
-            
             selected_files = file_selection.get("selected_files", [])
         
         if len(selected_files) > max_files:
@@ -239,10 +252,11 @@ async def get_repository_structure(
         owner, repo = parse_github_url(repo_url)
         print(f"Getting repository structure for {owner}/{repo}")
         
-        structure = await github_service.get_repo_structure(owner, repo)
-        
-        readme_content = await github_service.get_readme_content(owner, repo)
-        
+        structure, readme_content = await asyncio.gather(
+            github_service.get_repo_structure(owner, repo),
+            github_service.get_readme_content(owner, repo)
+        )
+
         readme_analysis = None
         if readme_content:
             repo_url = f"https://github.com/{owner}/{repo}"
@@ -310,14 +324,19 @@ async def commits(
     try:
         owner, repo = parse_github_url(repo_url)
         
-        total_commits = await github_service.get_total_commits_count(owner, repo, branch)
-        
-        commits_data = await github_service.get_repository_commits(owner, repo, branch, per_page)
-        
-        ai_commits_analysis = await ai_service.analyze_commits(commits_data, {"owner": owner, "repo": repo, "branch": branch}
-                                                               )
+        total_commits, commits_data = await asyncio.gather(
+            github_service.get_total_commits_count(owner, repo, branch),
+            github_service.get_repository_commits(owner, repo, branch, per_page)
+        )
+
         if not commits_data or not commits_data.get("commits"):
             raise HTTPException(status_code=404, detail="No commits found in repository")
+
+        ai_commits_analysis = await ai_service.analyze_commits(
+            commits_data.get("commits", []),
+            {"owner": owner, "repo": repo, "branch": branch, "total_commits": total_commits},
+            files_changed=commits_data.get("files_changed", [])
+        )
         
         
         return {
@@ -379,10 +398,11 @@ async def analyze_repository_commits(
 
         print(f"Starting commit analysis for {owner}/{repo} on branch {branch}")
         
-        total_commits = await github_service.get_total_commits_count(owner, repo, branch)
-        
-        commits_data = await github_service.get_repository_commits(owner, repo, branch, per_page)
-        
+        total_commits, commits_data = await asyncio.gather(
+            github_service.get_total_commits_count(owner, repo, branch),
+            github_service.get_repository_commits(owner, repo, branch, per_page)
+        )
+
         if not commits_data or not commits_data.get("commits"):
             raise HTTPException(status_code=404, detail="No commits found in repository")
         
@@ -405,7 +425,8 @@ async def analyze_repository_commits(
         commit_analysis = await ai_service.analyze_commits(
             commits_data=commits_data.get("commits", []),
             repo_info=repo_info,
-            readme_analysis=readme_analysis
+            readme_analysis=readme_analysis,
+            files_changed=commits_data.get("files_changed", [])
         )
         
         response = {
@@ -543,8 +564,10 @@ async def get_summer_analysis(
         if repo_url:
             owner, repo = parse_github_url(repo_url)
             
-            total_commits = await github_service.get_total_commits_count(owner, repo, "main")
-            commits_data = await github_service.get_repository_commits(owner, repo, "main", 100)
+            total_commits, commits_data = await asyncio.gather(
+                github_service.get_total_commits_count(owner, repo, "main"),
+                github_service.get_repository_commits(owner, repo, "main", 100)
+            )
             
             readme_analysis = None
             try:
@@ -19,6 +19,12 @@ class Settings(BaseSettings):
     summer_session_cookie: str = ""
     
     cerebras_api_key: str = ""
+
+    # Optional path for the on-disk AI response cache; empty disables it
+    ai_response_cache_path: str = ""
+
+    # Upper bound on concurrent in-flight completion requests per client
+    ai_max_concurrency: int = 16
     
     api_host: str = "0.0.0.0"
     api_port: int = 8000
@@ -1,12 +1,18 @@
 """
 Main FastAPI application
 """
+import asyncio
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import structlog
 
 from app.config import settings
 from app.api.routes import router as api_router
+from app.services.github import cleanup_github_service
+from app.services.ai import get_ai_service, cleanup_ai_service
+from app.services.summer_of_making import cleanup_summer_service
 
 
 
@@ -14,6 +20,9 @@ app = FastAPI(
     title=settings.api_title,
     version=settings.api_version,
     debug=settings.debug,
+    # Analysis responses carry large commit/feature payloads; orjson
+    # serializes them at C speed
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -34,14 +43,31 @@ async def health_check():
         "service": settings.api_title,
     }
 
+async def _warm_ai_client():
+    """Prime the AI client's connection pool with a tiny completion so the
+    first real analysis doesn't pay the handshake. Goes through
+    chat_completion directly: prompt() would serve the ping from the
+    response cache on every restart and never open a connection."""
+    try:
+        await get_ai_service().client.chat_completion(
+            messages=[{"role": "user", "content": "ping"}], max_tokens=1
+        )
+    except Exception as e:
+        print(f"AI client warm-up skipped: {e}")
+
 @app.on_event("startup")
 async def startup_event():
     """Application startup event"""
     print("Starting SlopScan backend")
+    # Held on app.state so the task isn't garbage-collected mid-flight
+    app.state.warmup_task = asyncio.create_task(_warm_ai_client())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown event"""
+    await cleanup_github_service()
+    await cleanup_ai_service()
+    await cleanup_summer_service()
     print("Shutting down SlopScan backend")
 
 if __name__ == "__main__":
@@ -1,16 +1,177 @@
+import asyncio
+import hashlib
 import httpx
 import json
+import logging
+import random
+import re
+import sqlite3
+import threading
 from typing import Optional, Dict, Any, List
 from app.config import settings
 from app.models import FileInfo
 from app.services.prompts import PromptTemplates
 
+logger = logging.getLogger(__name__)
+
+# orjson parses and serializes the request/response payloads at C speed;
+# stdlib json is only a fallback so source-only installs keep working
+try:
+    import orjson
+
+    def _json_loads(data: Any) -> Any:
+        return orjson.loads(data)
+
+    def _json_dump_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _json_loads(data: Any) -> Any:
+        return json.loads(data)
+
+    def _json_dump_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+_RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Backoff with jitter, stretched to honor an upstream Retry-After."""
+    delay = min(2 ** attempt, 30) + random.uniform(0, 0.5)
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return min(delay, 60.0)
+
+# Markers the README system prompt itself treats as AI tells; counted
+# here so overwhelming cases skip the LLM round-trip entirely
+_AI_MARKER_RE = re.compile(
+    r'—|✅|🎯|🚀|seamlessly integrat|leveraging cutting-edge|'
+    r'cutting-edge technology|comprehensive solution|effortlessly optimiz|'
+    r'robust platform|exceptional results',
+    re.IGNORECASE
+)
+
+
+def _quick_readme_score(readme_content: str) -> Optional[Dict[str, Any]]:
+    """Score trivially classifiable READMEs without an LLM call.
+
+    Returns None when unsure; borderline text always goes to the model.
+    """
+    stripped = readme_content.strip()
+    if len(stripped) < 100:
+        return {
+            "probability": 10,
+            "reasoning": "README is empty or only a few lines; too short to carry AI-typical structure. Scored without an LLM call.",
+            "complexity": 5,
+            "summary": stripped or "Empty README"
+        }
+
+    hits = len(_AI_MARKER_RE.findall(stripped))
+    # ~8+ markers per KB over a substantial document is far beyond what
+    # human-written READMEs show
+    if hits >= 20 and hits * 1000 >= len(stripped) * 8:
+        return {
+            "probability": 90,
+            "reasoning": f"README contains {hits} AI-typical markers (emoji bullets, em dashes, marketing buzz-phrases) at a density far above human-written documents. Scored without an LLM call.",
+            "complexity": 50,
+            "summary": stripped[:300]
+        }
+
+    return None
+
 
 class HackClubAIClient:
-    
-    def __init__(self):
+
+    def __init__(self, cache_path: Optional[str] = None):
         self.base_url = "https://ai.hackclub.com"
-        self.client = httpx.AsyncClient(timeout=60.0)
+        # Parsed once; httpx re-parses string URLs on every request
+        self._completions_url = httpx.URL(f"{self.base_url}/chat/completions")
+        # Generous keep-alive pool: concurrent analyses reuse warm
+        # connections to ai.hackclub.com instead of paying a TLS
+        # handshake per request
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=60.0
+            )
+        )
+
+        # Identical prompts issued concurrently share one completion
+        # instead of each paying for it (keyed by the cache fingerprint)
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        # Bound in-flight requests so a wide gather degrades to queueing
+        # here instead of a 429 storm upstream
+        self._request_sem = asyncio.BoundedSemaphore(settings.ai_max_concurrency)
+
+        # Optional on-disk cache keyed by a fingerprint of the full request,
+        # so re-analyzing an unchanged repo replays stored responses instead
+        # of paying for the same completions again
+        self._cache = None
+        self._cache_lock = threading.Lock()
+        if cache_path:
+            try:
+                self._cache = sqlite3.connect(cache_path, check_same_thread=False)
+                self._cache.execute('PRAGMA journal_mode=WAL')
+                self._cache.execute(
+                    'CREATE TABLE IF NOT EXISTS responses ('
+                    'fingerprint TEXT PRIMARY KEY, content TEXT)'
+                )
+                self._cache.commit()
+            except Exception as e:
+                logger.warning("Could not open response cache at %s: %s", cache_path, e)
+                self._cache = None
+
+    @staticmethod
+    def _fingerprint(prompt: str, system_message: Optional[str], model: str,
+                     temperature: float, max_tokens: int,
+                     response_format: Optional[Dict[str, str]] = None) -> str:
+        h = hashlib.sha256()
+        h.update(model.encode())
+        h.update(b'\x00')
+        # response_format is part of the key: a JSON-mode response must
+        # never be served for (or coalesced with) a plain call
+        h.update(repr((temperature, max_tokens, sorted((response_format or {}).items()))).encode())
+        h.update(b'\x00')
+        h.update((system_message or '').encode())
+        h.update(b'\x00')
+        h.update(prompt.encode())
+        return h.hexdigest()
+
+    def _cache_get(self, fingerprint: str) -> Optional[str]:
+        if self._cache is None:
+            return None
+        try:
+            with self._cache_lock:
+                row = self._cache.execute(
+                    'SELECT content FROM responses WHERE fingerprint = ?',
+                    (fingerprint,)
+                ).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            logger.warning("Response cache read failed: %s", e)
+            return None
+
+    def _cache_put(self, fingerprint: str, content: str) -> None:
+        if self._cache is None:
+            return
+        try:
+            with self._cache_lock:
+                self._cache.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?)',
+                    (fingerprint, content)
+                )
+                self._cache.commit()
+        except Exception as e:
+            logger.warning("Response cache write failed: %s", e)
     
     async def chat_completion(
         self,
@@ -18,7 +179,8 @@ class HackClubAIClient:
         model: str = "qwen/qwen3-32b",
         temperature: float = 0.6,
         max_tokens: int = 2000,
-        stream: bool = False
+        stream: bool = False,
+        response_format: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         try:
             payload = {
@@ -28,20 +190,69 @@ class HackClubAIClient:
                 "max_tokens": max_tokens,
                 "stream": stream
             }
+            if response_format is not None:
+                payload["response_format"] = response_format
             
-            response = await self.client.post(
-                f"{self.base_url}/chat/completions",
-                headers={"Content-Type": "application/json"},
-                json=payload
-            )
-            response.raise_for_status()
-            
-            return response.json()
-            
+            if stream:
+                return await self._stream_completion(payload)
+
+            # Connection resets, timeouts, 429s and gateway errors are worth
+            # a couple of cheap retries before the caller rebuilds and
+            # resends everything
+            body = _json_dump_bytes(payload)
+            for attempt in range(3):
+                try:
+                    async with self._request_sem:
+                        response = await self.client.post(
+                            self._completions_url,
+                            content=body,
+                            headers=_JSON_HEADERS
+                        )
+                    if response.status_code in _RETRYABLE_STATUSES and attempt < 2:
+                        await asyncio.sleep(_retry_delay(response, attempt))
+                        continue
+                    response.raise_for_status()
+                    return _json_loads(response.content)
+                except httpx.TransportError:
+                    if attempt == 2:
+                        raise
+                    await asyncio.sleep(0.2 * (2 ** attempt) + random.uniform(0, 0.1))
+
         except httpx.HTTPError as e:
             raise Exception(f"HTTP error occurred: {e}")
         except Exception as e:
             raise Exception(f"Error in AI request: {e}")
+
+    async def _stream_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Consume an SSE completion stream into a chat_completion-shaped dict.
+
+        Content deltas are accumulated as they arrive instead of buffering
+        the whole response body first, so slow generations surface their
+        text without waiting on the final chunk's framing.
+        """
+        parts: List[str] = []
+        async with self._request_sem:
+            async with self.client.stream(
+                "POST",
+                self._completions_url,
+                content=_json_dump_bytes(payload),
+                headers=_JSON_HEADERS
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = _json_loads(data)
+                    except json.JSONDecodeError:
+                        continue
+                    choices = chunk.get("choices")
+                    if choices and choices[0].get("delta", {}).get("content"):
+                        parts.append(choices[0]["delta"]["content"])
+        return {"choices": [{"message": {"content": "".join(parts)}}]}
     
     async def prompt(
         self,
@@ -49,38 +260,90 @@ class HackClubAIClient:
         system_message: Optional[str] = None,
         model: str = "qwen/qwen3-32b",
         temperature: float = 0.7,
-        max_tokens: int = 1000
+        max_tokens: int = 1000,
+        response_format: Optional[Dict[str, str]] = None
+    ) -> str:
+        fingerprint = self._fingerprint(prompt, system_message, model, temperature,
+                                        max_tokens, response_format)
+        cached = self._cache_get(fingerprint)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(fingerprint)
+        if task is None:
+            task = asyncio.ensure_future(self._prompt_uncached(
+                fingerprint, prompt, system_message, model,
+                temperature, max_tokens, response_format
+            ))
+            self._inflight[fingerprint] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(fingerprint, None))
+        return await task
+
+    async def _prompt_uncached(
+        self,
+        fingerprint: str,
+        prompt: str,
+        system_message: Optional[str],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        response_format: Optional[Dict[str, str]]
     ) -> str:
         messages = []
-        
+
         if system_message:
             messages.append({"role": "system", "content": system_message})
-        
+
         messages.append({"role": "user", "content": prompt})
-        
+
         try:
             response = await self.chat_completion(
                 messages=messages,
                 model=model,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                response_format=response_format
             )
             
             if "choices" in response and len(response["choices"]) > 0:
-                return response["choices"][0]["message"]["content"]
+                content = response["choices"][0]["message"]["content"]
+                self._cache_put(fingerprint, content)
+                return content
             else:
                 raise Exception("No response content found")
                 
         except Exception as e:
             raise Exception(f"Error in prompt: {e}")
     
+    async def gather_prompts(
+        self,
+        prompts: List[tuple],
+        **kwargs
+    ) -> List[str]:
+        """Run independent (system_message, user_prompt) pairs concurrently.
+
+        Results come back in input order; concurrency is bounded so a
+        large batch doesn't flood the upstream.
+        """
+        semaphore = asyncio.Semaphore(8)
+
+        async def run(system_message: Optional[str], user_prompt: str) -> str:
+            async with semaphore:
+                return await self.prompt(
+                    prompt=user_prompt,
+                    system_message=system_message,
+                    **kwargs
+                )
+
+        return list(await asyncio.gather(*(run(s, u) for s, u in prompts)))
+
     async def close(self):
         await self.client.aclose()
 
 
-class AIService:    
+class AIService:
     def __init__(self):
-        self.client = HackClubAIClient()
+        self.client = HackClubAIClient(cache_path=settings.ai_response_cache_path or None)
     
     async def analyze_files_for_selection(self, files: List[FileInfo], repo_context: Dict[str, Any]) -> Dict[str, Any]:
         file_descriptions = []
@@ -139,6 +402,10 @@ class AIService:
             print(f"AI analysis failed: {str(e)}")
     
     async def analyze_readme(self, readme_content: str, repo_url: str) -> Dict[str, Any]:
+        quick_result = _quick_readme_score(readme_content)
+        if quick_result is not None:
+            return quick_result
+
         system_message, user_prompt = PromptTemplates.readme_analysis_prompt(
             readme_content, repo_url
         )
@@ -158,22 +425,66 @@ class AIService:
                 "error": f"Failed to analyze README: {str(e)}"
             }
     
+    async def analyze_repo_combined(
+        self,
+        readme_content: str,
+        repo_url: str,
+        structure: Dict[str, Any],
+        max_files: int = 20
+    ) -> Dict[str, Any]:
+        try:
+            system_message, user_prompt = PromptTemplates.combined_readme_file_selection(
+                readme_content, repo_url, structure, max_files
+            )
+
+            response = await self.client.prompt(
+                prompt=user_prompt,
+                system_message=system_message,
+                temperature=0.3,
+                max_tokens=4000
+            )
+
+            ai_analysis = self._parse_json_response(response)
+
+            if "error" in ai_analysis:
+                return {
+                    "error": ai_analysis["error"],
+                    "raw_response": ai_analysis.get("raw_analysis", response)
+                }
+
+            selected_files = ai_analysis.get("selected_files", [])
+
+            return {
+                "readme_analysis": ai_analysis.get("readme_analysis", {}),
+                "file_selection": {
+                    "selected_files": selected_files,
+                    "total_selected": len(selected_files),
+                }
+            }
+
+        except Exception as e:
+            return {
+                "error": f"Failed combined repo analysis: {str(e)}"
+            }
+
     async def analyze_commits(
         self,
         commits_data: List[Dict[str, Any]],
         repo_info: Dict[str, Any],
-        readme_analysis: Dict[str, Any] = None
+        readme_analysis: Dict[str, Any] = None,
+        files_changed: List[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         try:
             total_commits = repo_info.get('total_commits', len(commits_data))
-            
+
             readme = readme_analysis or {}
-            
+
             system_message, user_prompt = PromptTemplates.commits_analysis_prompt(
                 total_commits=total_commits,
                 readme=readme,
                 commits_data=commits_data,
-                repo_info=repo_info
+                repo_info=repo_info,
+                files_changed=files_changed
             )
             
             response = await self.client.prompt(
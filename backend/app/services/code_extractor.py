@@ -1,363 +1,758 @@
 import tree_sitter
-from tree_sitter import Language, Parser, Node
+from tree_sitter import Language, Parser, Node, Query, QueryCursor
+import importlib
+import logging
 import os
-from typing import Dict, List, Set, Any, Optional, Tuple
-from dataclasses import dataclass
-from pathlib import Path
+import pickle
+import sqlite3
+import sys
+import threading
+from typing import Dict, List, Any, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from enum import IntFlag
 import re
 
-@dataclass
+# RE2 matches in guaranteed linear time, so the fallback string/comment
+# patterns cannot backtrack catastrophically on adversarial inputs
+# (e.g. long unterminated strings). Purely optional — CPython re is the
+# default when pyre2 is not installed.
+try:
+    import re2 as _fallback_re
+except ImportError:
+    _fallback_re = re
+
+# logging instead of print: handlers can gate, buffer and dedupe, so a
+# worker pool spawning many extractors does not spam stdout in lockstep
+logger = logging.getLogger(__name__)
+
+# Sources above this size (vendored bundles, minified JS) skip tree-sitter
+# entirely: their AST can dwarf the source and they are rarely hand-written
+_FALLBACK_SIZE_LIMIT = 5 * 1024 * 1024
+
+# One query with named captures per feature kind, so the C query engine
+# walks the tree exactly once per file. The anchored @doc patterns match
+# only structural docstring positions (first statement of a body).
+PYTHON_FEATURE_QUERY = """
+(function_definition name: (identifier) @fn)
+(class_definition name: (identifier) @cls)
+(assignment left: (identifier) @var)
+(string) @str
+(comment) @cmt
+(import_statement) @imp
+(import_from_statement) @imp
+(function_definition body: (block . (expression_statement (string) @doc)))
+(class_definition body: (block . (expression_statement (string) @doc)))
+(module . (expression_statement (string) @doc))
+"""
+
+JS_FEATURE_QUERY = """
+(function_declaration name: (identifier) @fn)
+(function_expression name: (identifier) @fn)
+(variable_declarator name: (identifier) @fn value: (arrow_function))
+(class_declaration name: (identifier) @cls)
+(method_definition name: (property_identifier) @meth)
+(variable_declarator name: (identifier) @var)
+(import_statement) @imp
+(string) @str
+(template_string) @str
+(comment) @cmt
+"""
+
+# Same shape as the JS query, but the TS grammar types class names as
+# type_identifier rather than identifier
+TS_FEATURE_QUERY = JS_FEATURE_QUERY.replace(
+    '(class_declaration name: (identifier) @cls)',
+    '(class_declaration name: (type_identifier) @cls)',
+)
+
+JAVA_FEATURE_QUERY = """
+(method_declaration name: (identifier) @meth)
+(class_declaration name: (identifier) @cls)
+(variable_declarator name: (identifier) @var)
+(import_declaration) @imp
+(string_literal) @str
+(line_comment) @cmt
+(block_comment) @bcmt
+"""
+
+# Languages whose extraction runs fully inside the C query engine; the
+# rest keep cursor walks for heuristics queries can't express
+_FEATURE_QUERIES = {
+    'python': PYTHON_FEATURE_QUERY,
+    'javascript': JS_FEATURE_QUERY,
+    'typescript': TS_FEATURE_QUERY,
+    'tsx': TS_FEATURE_QUERY,
+    'java': JAVA_FEATURE_QUERY,
+}
+
+# Static language -> (module name, language function) table so initialization is
+# one import + one getattr per language instead of hasattr probing
+_LANG_TABLE = {
+    'python':     ('tree_sitter_python',     'language'),
+    'javascript': ('tree_sitter_javascript', 'language'),
+    'java':       ('tree_sitter_java',       'language'),
+    'cpp':        ('tree_sitter_cpp',        'language'),
+    'c':          ('tree_sitter_c',          'language'),
+    'go':         ('tree_sitter_go',         'language'),
+    'rust':       ('tree_sitter_rust',       'language'),
+    'ruby':       ('tree_sitter_ruby',       'language'),
+    'php':        ('tree_sitter_php',        'language_php'),
+    'typescript': ('tree_sitter_typescript', 'language_typescript'),
+    'tsx':        ('tree_sitter_typescript', 'language_tsx'),
+}
+
+# Doc-comment markers, detected with one tuple-argument startswith
+_DOC_COMMENT_PREFIXES = ('/**', '/*!', '///', '//!')
+
+# Doc-tag markers folded into one alternation so each comment is scanned
+# once instead of once per marker
+_DOC_TAG_RE = re.compile(r'@(?:param|return|throws|var|author)\b')
+
+# Strips doc-comment markers in a single C-side match instead of a Python
+# prefix/suffix loop per comment node. C-style grammars share one pattern.
+_C_STYLE_DOC_RE = re.compile(r'^(?:/\*[\*!]|//[/!])\s*(.*?)\s*(?:\*/)?$', re.S)
+_DOCSTRIP = {
+    'c': _C_STYLE_DOC_RE,
+    'cpp': _C_STYLE_DOC_RE,
+    'rust': _C_STYLE_DOC_RE,
+}
+
+# Allocated once at module scope; detect_language is called once per file
+# in batch paths, so no Path object construction there
+_EXT_TO_LANG = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'tsx',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.cxx': 'cpp',
+    '.cc': 'cpp',
+    '.c': 'c',
+    '.h': 'c',
+    '.hpp': 'cpp',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.rb': 'ruby',
+    '.php': 'php'
+}
+
+
+# Fallback extraction uses one named-group alternation per language family,
+# compiled once at import: a single finditer pass over the source replaces
+# the previous scan-per-pattern approach, and matches are routed to feature
+# buckets by lastgroup. Compiled with RE2 when available (the patterns
+# use inline (?s:...) instead of re.DOTALL to stay within RE2's supported
+# syntax; pyre2 transparently falls back to stdlib re for the Python
+# bundle, whose assignment branch needs a lookahead). Patterns are bytes
+# so the engine scans the UTF-8 source directly — no decode of the whole
+# file, only the matched slices become str.
+_FALLBACK_STRING_ALT = (
+    rb'(?P<string>"(?:[^"\\]|\\.)*"'
+    rb"|'(?:[^'\\]|\\.)*'"
+    rb'|`(?:[^`\\]|\\.)*`)'
+)
+_C_STYLE_COMMENT_ALT = (
+    rb'(?P<comment>//.*)'
+    rb'|/\*(?P<block_comment>(?s:.*?))\*/'
+)
+_PY_COMBINED_RE = _fallback_re.compile(
+    rb'"""(?P<doc_dq>(?s:.*?))"""'
+    rb"|'''(?P<doc_sq>(?s:.*?))'''"
+    rb'|' + _FALLBACK_STRING_ALT +
+    rb'|(?P<comment>#.*)'
+    rb'|def\s+(?P<func>\w+)'
+    rb'|class\s+(?P<cls>\w+)'
+    # Line-anchored with (?!=) so comparisons like == and substrings of
+    # longer identifiers no longer land in variable_names
+    rb'|^[ \t]*(?P<var>\w+)[ \t]*=(?!=)',
+    re.M
+)
+_JS_COMBINED_RE = _fallback_re.compile(
+    _FALLBACK_STRING_ALT +
+    rb'|' + _C_STYLE_COMMENT_ALT +
+    rb'|function\s+(?P<func>\w+)'
+    rb'|class\s+(?P<cls>\w+)'
+)
+_JAVA_COMBINED_RE = _fallback_re.compile(
+    _FALLBACK_STRING_ALT +
+    rb'|' + _C_STYLE_COMMENT_ALT +
+    rb'|class\s+(?P<cls>\w+)'
+    rb'|(?:public|private|protected)?\s*(?:static)?\s*\w+\s+(?P<method>\w+)\s*\('
+)
+_C_STYLE_COMBINED_RE = _fallback_re.compile(_FALLBACK_STRING_ALT + rb'|' + _C_STYLE_COMMENT_ALT)
+_DEFAULT_COMBINED_RE = _fallback_re.compile(_FALLBACK_STRING_ALT)
+
+_FALLBACK_COMBINED = {
+    'python': _PY_COMBINED_RE,
+    'javascript': _JS_COMBINED_RE,
+    'typescript': _JS_COMBINED_RE,
+    'tsx': _JS_COMBINED_RE,
+    'java': _JAVA_COMBINED_RE,
+    'c': _C_STYLE_COMBINED_RE,
+    'cpp': _C_STYLE_COMBINED_RE,
+    'go': _C_STYLE_COMBINED_RE,
+    'rust': _C_STYLE_COMBINED_RE,
+    'php': _C_STYLE_COMBINED_RE,
+}
+
+# Subtrees the cursor walks never need to enter: their feature value is
+# the whole node text (strings, comments, imports), so descending only
+# multiplies node visits
+_SKIP_DESCEND = {
+    'c': frozenset({'string_literal', 'comment', 'preproc_include', 'preproc_import'}),
+    'cpp': frozenset({'string_literal', 'comment', 'preproc_include', 'preproc_import'}),
+    'go': frozenset({'interpreted_string_literal', 'raw_string_literal', 'comment',
+                     'import_declaration'}),
+    'rust': frozenset({'string_literal', 'line_comment', 'block_comment',
+                       'use_declaration', 'extern_crate_declaration'}),
+    'ruby': frozenset({'string', 'comment'}),
+    'php': frozenset({'string', 'comment'}),
+}
+
+# Capture-group name -> CodeFeatures attribute
+_FALLBACK_BUCKETS = {
+    'string': 'strings',
+    'comment': 'comments',
+    'block_comment': 'comments',
+    'doc_dq': 'docstrings',
+    'doc_sq': 'docstrings',
+    'func': 'function_names',
+    'cls': 'class_names',
+    'method': 'method_names',
+    'var': 'variable_names',
+}
+
+
+class FeatureMask(IntFlag):
+    """Selects which feature categories extraction should collect.
+
+    Callers that only need names and imports can mask off strings,
+    comments and docstrings to skip those branches entirely.
+    """
+    STRINGS = 1
+    NAMES = 2
+    COMMENTS = 4
+    DOCSTRINGS = 8
+    IMPORTS = 16
+    ALL = 31
+
+
+# CodeFeatures attribute -> FeatureMask bit, so the fallback pass honors
+# the same mask as the tree-sitter extractors
+_BUCKET_MASK = {
+    'strings': FeatureMask.STRINGS,
+    'comments': FeatureMask.COMMENTS,
+    'docstrings': FeatureMask.DOCSTRINGS,
+    'imports': FeatureMask.IMPORTS,
+    'function_names': FeatureMask.NAMES,
+    'class_names': FeatureMask.NAMES,
+    'method_names': FeatureMask.NAMES,
+    'variable_names': FeatureMask.NAMES,
+}
+
+
+def _walk_tree(root: Node, skip: frozenset = frozenset()):
+    """Yield every node depth-first using the C TreeCursor.
+
+    Each step is a C call instead of a Python frame, so deeply nested
+    expressions neither pay per-node function-call overhead nor hit the
+    recursion limit. Nodes whose type is in ``skip`` are yielded but not
+    descended into — extractors use this to prune subtrees (string
+    innards, comment bodies, import clauses) that no branch inspects.
+    """
+    cursor = root.walk()
+    visited_children = False
+    while True:
+        if not visited_children:
+            node = cursor.node
+            yield node
+            if node.type not in skip and cursor.goto_first_child():
+                continue
+        if cursor.goto_next_sibling():
+            visited_children = False
+        elif cursor.goto_parent():
+            visited_children = True
+        else:
+            break
+
+
+# slots=True drops the per-instance __dict__: less memory per file scanned
+# and faster attribute access in the traversal hot loops
+@dataclass(slots=True)
 class CodeFeatures:
-    strings: List[str]
-    function_names: List[str]
-    variable_names: List[str]
-    comments: List[str]
-    docstrings: List[str]
-    class_names: List[str]
-    method_names: List[str]
-    imports: List[str]
-    language: str
+    strings: List[str] = field(default_factory=list)
+    function_names: List[str] = field(default_factory=list)
+    variable_names: List[str] = field(default_factory=list)
+    comments: List[str] = field(default_factory=list)
+    docstrings: List[str] = field(default_factory=list)
+    class_names: List[str] = field(default_factory=list)
+    method_names: List[str] = field(default_factory=list)
+    imports: List[str] = field(default_factory=list)
+    language: str = "unknown"
     file_path: Optional[str] = None
 
 
+_BUCKET_FIELDS = ('strings', 'function_names', 'variable_names', 'comments',
+                  'docstrings', 'class_names', 'method_names', 'imports')
+
+
+@dataclass(slots=True)
+class CodeFeaturesCompact:
+    """Memory-lean form of CodeFeatures for holding whole-repo scan results.
+
+    Each bucket is packed into a single utf-8 arena plus an (start, end)
+    offset table — roughly 16 bytes per entry instead of one multi-hundred-
+    byte str object each. Decode back to lists lazily via bucket().
+    """
+    language: str = "unknown"
+    file_path: Optional[str] = None
+    arenas: Dict[str, bytes] = field(default_factory=dict)
+    offsets: Dict[str, List[tuple]] = field(default_factory=dict)
+
+    @classmethod
+    def from_features(cls, features: CodeFeatures) -> 'CodeFeaturesCompact':
+        compact = cls(language=features.language, file_path=features.file_path)
+        for name in _BUCKET_FIELDS:
+            parts = [s.encode('utf8') for s in getattr(features, name)]
+            table = []
+            pos = 0
+            for part in parts:
+                table.append((pos, pos + len(part)))
+                pos += len(part)
+            compact.arenas[name] = b''.join(parts)
+            compact.offsets[name] = table
+        return compact
+
+    def bucket(self, name: str) -> List[str]:
+        arena = self.arenas[name]
+        return [arena[start:end].decode('utf8')
+                for start, end in self.offsets[name]]
+
+    def to_features(self) -> CodeFeatures:
+        features = CodeFeatures(language=self.language, file_path=self.file_path)
+        for name in _BUCKET_FIELDS:
+            setattr(features, name, self.bucket(name))
+        return features
+
+
 class TreeSitterExtractor:
     
-    def __init__(self):
-        self.parsers = {}
+    def __init__(self, cache_path: Optional[str] = None):
+        # Language objects are immutable and shared; Parser objects are not
+        # thread-safe, so each thread gets its own pool via _get_parser
         self.languages = {}
-        self._init_languages()
-    
-    def _init_languages(self):
-        lang_mappings = {
-            'python': 'tree_sitter_python',
-            'javascript': 'tree_sitter_javascript', 
-            'java': 'tree_sitter_java',
-            'cpp': 'tree_sitter_cpp',
-            'c': 'tree_sitter_c',
-            'go': 'tree_sitter_go',
-            'rust': 'tree_sitter_rust',
-            'ruby': 'tree_sitter_ruby',
-            'php': 'tree_sitter_php'
-        }
-        
-        for lang_name, module_name in lang_mappings.items():
+        self._thread_parsers = threading.local()
+
+        # Optional on-disk cache keyed by (path, mtime, size) so re-scans
+        # of unchanged files skip parsing entirely
+        self._cache = None
+        self._cache_lock = threading.Lock()
+        if cache_path:
             try:
-                language_module = __import__(module_name)
-                language_func = None
-                
-                if lang_name == 'php':
-                    if hasattr(language_module, 'language_php'):
-                        language_func = getattr(language_module, 'language_php')
-                    elif hasattr(language_module, 'language_php_only'):
-                        language_func = getattr(language_module, 'language_php_only')
-                else:
-                    for func_name in ['language', f'language_{lang_name}', 'get_language']:
-                        if hasattr(language_module, func_name):
-                            language_func = getattr(language_module, func_name)
-                            break
-                
-                if language_func is None:
-                    print(f"Warning: Could not find language function in {module_name}")
-                    continue
-                
-                language = Language(language_func())
-                parser = Parser(language)
-                
-                self.languages[lang_name] = language
-                self.parsers[lang_name] = parser
-                
-            except ImportError:
-                print(f"Warning: {module_name} not available, skipping {lang_name}")
-                print(f"Install with: pip install {module_name.replace('_', '-')}")
+                self._cache = sqlite3.connect(cache_path, check_same_thread=False)
+                self._cache.execute('PRAGMA journal_mode=WAL')
+                self._cache.execute(
+                    'CREATE TABLE IF NOT EXISTS features ('
+                    'path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, data BLOB)'
+                )
+                self._cache.commit()
             except Exception as e:
-                print(f"Error initializing {lang_name}: {e}")
-        
+                logger.warning("Could not open feature cache at %s: %s", cache_path, e)
+                self._cache = None
+        self._queries = {}
+        self._generic_queries = {}
+
+        # Language -> bound extractor method: one hash lookup per file
+        # instead of walking an if/elif chain of string comparisons
+        self._extractors = {
+            'python': self._extract_python_features,
+            'javascript': self._extract_js_ts_features,
+            'typescript': self._extract_js_ts_features,
+            'tsx': self._extract_js_ts_features,
+            'java': self._extract_java_features,
+            'c': self._extract_c_cpp_features,
+            'cpp': self._extract_c_cpp_features,
+            'go': self._extract_go_features,
+            'rust': self._extract_rust_features,
+            'ruby': self._extract_ruby_features,
+            'php': self._extract_php_features,
+        }
+
+        # Exact string/comment node-type names across the bundled grammars,
+        # so generic extraction dispatches with one hash probe instead of a
+        # substring scan of every node's type name
+        self._string_types = frozenset({
+            'string', 'string_literal', 'raw_string_literal',
+            'interpreted_string_literal', 'template_string', 'string_content',
+            'char_literal', 'character_literal', 'heredoc_body',
+            'encapsed_string', 'interpolated_string_literal',
+        })
+        self._comment_types = frozenset({
+            'comment', 'line_comment', 'block_comment', 'doc_comment',
+        })
+
+    def _ensure_language(self, lang_name: str) -> bool:
+        """Load a grammar on first use so unused languages cost nothing at startup."""
+        if lang_name in self.languages:
+            return True
+        if lang_name not in _LANG_TABLE:
+            return False
+
+        module_name, attr_name = _LANG_TABLE[lang_name]
         try:
-            import tree_sitter_typescript
-            
-            typescript_language = Language(tree_sitter_typescript.language_typescript())
-            typescript_parser = Parser(typescript_language)
-            self.languages['typescript'] = typescript_language
-            self.parsers['typescript'] = typescript_parser
-            
-            tsx_language = Language(tree_sitter_typescript.language_tsx())
-            tsx_parser = Parser(tsx_language)
-            self.languages['tsx'] = tsx_language
-            self.parsers['tsx'] = tsx_parser
-            
+            language_module = importlib.import_module(module_name)
+            language = Language(getattr(language_module, attr_name)())
         except ImportError:
-            print("Warning: tree_sitter_typescript not available, skipping typescript and tsx")
-            print("Install with: pip install tree-sitter-typescript")
+            logger.warning("%s not available, skipping %s (install with: pip install %s)",
+                           module_name, lang_name, module_name.replace('_', '-'))
+            return False
         except Exception as e:
-            print(f"Error initializing TypeScript/TSX: {e}")
+            logger.warning("Error initializing %s: %s", lang_name, e)
+            return False
+
+        self.languages[lang_name] = language
+
+        query_src = _FEATURE_QUERIES.get(lang_name)
+        if query_src is not None:
+            try:
+                self._queries[lang_name] = Query(language, query_src)
+            except Exception as e:
+                logger.warning("Error compiling %s feature query: %s", lang_name, e)
+
+        return True
     
+    def _get_parser(self, language: str) -> Parser:
+        """Return this thread's parser for a language, building it lazily.
+
+        Tree-sitter parsers must not be used from two threads at once;
+        per-thread instances let concurrent extraction proceed while the
+        heavyweight Language objects stay shared.
+        """
+        pool = getattr(self._thread_parsers, 'pool', None)
+        if pool is None:
+            pool = self._thread_parsers.pool = {}
+        parser = pool.get(language)
+        if parser is None:
+            parser = pool[language] = Parser(self.languages[language])
+        return parser
+
+    def _parse_guarded(self, language: str, source: bytes):
+        """Parse source bytes, releasing parser state afterwards.
+
+        The pinned py-tree-sitter release crashes when a read callback is
+        combined with progress_callback (and ignores progress_callback for
+        bytestrings entirely), so bytes are parsed directly; pathological
+        inputs are bounded by the _FALLBACK_SIZE_LIMIT check upstream
+        rather than a wall-clock cap. reset() after every parse drops
+        internal state sized to the largest input so the shared parsers
+        don't pin peak memory for a whole scan. Returns None on failure.
+        """
+        parser = self._get_parser(language)
+        try:
+            tree = parser.parse(source)
+        except Exception as e:
+            logger.warning("Parse failed for %s source: %s, using fallback extraction.",
+                           language, e)
+            tree = None
+        finally:
+            parser.reset()
+        return tree
+
     def detect_language(self, file_path: str) -> Optional[str]:
-        ext_to_lang = {
-            '.py': 'python',
-            '.js': 'javascript', 
-            '.jsx': 'javascript',
-            '.ts': 'typescript',
-            '.tsx': 'tsx',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.cxx': 'cpp',
-            '.cc': 'cpp',
-            '.c': 'c',
-            '.h': 'c',
-            '.hpp': 'cpp',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.rb': 'ruby',
-            '.php': 'php'
-        }
-        
-        suffix = Path(file_path).suffix.lower()
-        return ext_to_lang.get(suffix)
+        dot = file_path.rfind('.')
+        if dot < 0:
+            return None
+        return _EXT_TO_LANG.get(file_path[dot:].lower())
     
-    def extract_features(self, code: str, language: str, file_path: Optional[str] = None) -> CodeFeatures:
-        if language not in self.parsers:
-            print("Language not supported by Tree-sitter, using fallback extraction.")
-            return self._fallback_extraction(code, language, file_path)
-        
-        parser = self.parsers[language]
-        tree = parser.parse(bytes(code, 'utf8'))
-        
+    def extract_features(self, code, language: str, file_path: Optional[str] = None,
+                         mask: FeatureMask = FeatureMask.ALL) -> CodeFeatures:
+        """Extract features from source given as str or bytes.
+
+        Passing bytes skips one full encode of the source; callers that
+        read files should prefer extract_features_from_path, which also
+        checks the on-disk feature cache.
+        """
+        code_bytes = code if isinstance(code, bytes) else bytes(code, 'utf8')
+
+        if len(code_bytes) > _FALLBACK_SIZE_LIMIT:
+            logger.debug("Source over %d bytes, using fallback extraction.", _FALLBACK_SIZE_LIMIT)
+            return self._fallback_extraction(code_bytes, language, file_path, mask)
+
+        if not self._ensure_language(language):
+            logger.debug("Language not supported by Tree-sitter, using fallback extraction.")
+            return self._fallback_extraction(code_bytes, language, file_path, mask)
+
+        tree = self._parse_guarded(language, code_bytes)
+        if tree is None:
+            return self._fallback_extraction(code_bytes, language, file_path, mask)
+        return self._collect_features(tree, code_bytes, language, file_path, mask)
+
+    def extract_features_from_path(self, file_path: str, language: Optional[str] = None,
+                                   mask: FeatureMask = FeatureMask.ALL) -> CodeFeatures:
+        """Extract features from a file on disk.
+
+        The file is read in binary once and parsed as a single buffer;
+        sources over _FALLBACK_SIZE_LIMIT skip the parser entirely.
+        """
+        if language is None:
+            language = self.detect_language(file_path)
+
+        st = None
+        if self._cache is not None:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                pass
+            if st is not None:
+                cached = self._cache_get(file_path, st.st_mtime_ns, st.st_size)
+                if cached is not None:
+                    return cached
+
+        try:
+            too_big = (st.st_size if st is not None
+                       else os.path.getsize(file_path)) > _FALLBACK_SIZE_LIMIT
+        except OSError:
+            too_big = False
+
+        if too_big or not language or not self._ensure_language(language):
+            logger.debug("Language not supported by Tree-sitter or file too large, "
+                         "using fallback extraction.")
+            with open(file_path, 'rb') as f:
+                features = self._fallback_extraction(f.read(), language or 'unknown', file_path, mask)
+            if st is not None:
+                self._cache_put(file_path, st.st_mtime_ns, st.st_size, features)
+            return features
+
+        with open(file_path, 'rb') as f:
+            code_bytes = f.read()
+        if not code_bytes:
+            return CodeFeatures(language=language, file_path=file_path)
+
+        tree = self._parse_guarded(language, code_bytes)
+
+        if tree is None:
+            features = self._fallback_extraction(code_bytes, language, file_path, mask)
+        else:
+            features = self._collect_features(tree, code_bytes, language, file_path, mask)
+        if st is not None:
+            self._cache_put(file_path, st.st_mtime_ns, st.st_size, features)
+        return features
+
+    def _cache_get(self, path: str, mtime_ns: int, size: int) -> Optional[CodeFeatures]:
+        try:
+            with self._cache_lock:
+                row = self._cache.execute(
+                    'SELECT mtime_ns, size, data FROM features WHERE path = ?', (path,)
+                ).fetchone()
+            if row is not None and row[0] == mtime_ns and row[1] == size:
+                return pickle.loads(row[2])
+        except Exception as e:
+            logger.warning("Feature cache read failed for %s: %s", path, e)
+        return None
+
+    def _cache_put(self, path: str, mtime_ns: int, size: int, features: CodeFeatures):
+        try:
+            blob = pickle.dumps(features, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._cache_lock:
+                self._cache.execute(
+                    'INSERT OR REPLACE INTO features (path, mtime_ns, size, data) '
+                    'VALUES (?, ?, ?, ?)', (path, mtime_ns, size, blob)
+                )
+                self._cache.commit()
+        except Exception as e:
+            logger.warning("Feature cache write failed for %s: %s", path, e)
+
+    def _collect_features(self, tree, code_bytes: bytes, language: str, file_path: Optional[str],
+                          mask: FeatureMask) -> CodeFeatures:
+        # deque appends are O(1) without the periodic reallocation lists pay
+        # while growing; the dedup pass below materializes plain lists
         features = CodeFeatures(
-            strings=[],
-            function_names=[],
-            variable_names=[],
-            comments=[],
-            docstrings=[],
-            class_names=[],
-            method_names=[],
-            imports=[],
-            language=language,
-            file_path=file_path
+            strings=deque(), function_names=deque(), variable_names=deque(),
+            comments=deque(), docstrings=deque(), class_names=deque(),
+            method_names=deque(), imports=deque(),
+            language=language, file_path=file_path
         )
+
+        extractor = self._extractors.get(language, self._extract_generic_features)
+        extractor(tree.root_node, code_bytes, features, mask)
         
-        if language == 'python':
-            self._extract_python_features(tree.root_node, code, features)
-        elif language in ['javascript', 'typescript', 'tsx']:
-            self._extract_js_ts_features(tree.root_node, code, features)
-        elif language == 'java':
-            self._extract_java_features(tree.root_node, code, features)
-        elif language in ['c', 'cpp']:
-            self._extract_c_cpp_features(tree.root_node, code, features)
-        elif language == 'go':
-            self._extract_go_features(tree.root_node, code, features)
-        elif language == 'rust':
-            self._extract_rust_features(tree.root_node, code, features)
-        elif language == 'ruby':
-            self._extract_ruby_features(tree.root_node, code, features)
-        elif language == 'php':
-            self._extract_php_features(tree.root_node, code, features)
-        else:
-            self._extract_generic_features(tree.root_node, code, features)
-        
-        features.strings = list(set(s.strip('"\'') for s in features.strings if len(s.strip('"\'')) > 2))
-        features.function_names = list(set(features.function_names))
-        features.variable_names = list(set(features.variable_names))
-        features.comments = list(set(c.strip() for c in features.comments if len(c.strip()) > 5))
-        features.docstrings = list(set(d.strip() for d in features.docstrings if len(d.strip()) > 10))
-        features.class_names = list(set(features.class_names))
-        features.method_names = list(set(features.method_names))
-        features.imports = list(set(features.imports))
-        
+        # dict.fromkeys dedups in one ordered pass (strip runs once per
+        # element instead of twice); interning the name buckets shares the
+        # short identifier strings across every file in the process
+        features.strings = list(dict.fromkeys(
+            stripped for s in features.strings if len(stripped := s.strip('"\'')) > 2
+        ))
+        features.comments = list(dict.fromkeys(
+            stripped for c in features.comments if len(stripped := c.strip()) > 5
+        ))
+        features.docstrings = list(dict.fromkeys(
+            stripped for d in features.docstrings if len(stripped := d.strip()) > 10
+        ))
+        for name in ('function_names', 'variable_names', 'class_names',
+                     'method_names', 'imports'):
+            setattr(features, name,
+                    [sys.intern(s) for s in dict.fromkeys(getattr(features, name))])
+
         return features
     
-    def _extract_python_features(self, node: Node, code: str, features: CodeFeatures):
-        def traverse(node: Node):
-            code_bytes = code.encode("utf8")
-            node_type = node.type
-            node_text = code_bytes[node.start_byte:node.end_byte].decode("utf8")
-            
-            if node_type == 'string':
-                features.strings.append(node_text)
-                
-                # Totally overcomplicated docstring detection
-                parent = node.parent
-                if (parent and parent.type == 'expression_statement' and
-                    parent.parent and parent.parent.type in ['block', 'suite']):
-                    
-                    block = parent.parent
-                    definition = block.parent
-                    
-                    if (definition and definition.type in ['function_definition', 'class_definition'] and
-                        block.children and parent == next((child for child in block.children 
-                                                         if child.type not in ['newline', 'indent', 'dedent', ':']), None)):
-                        
-                        docstring_content = node_text.strip()
-                        for quote in ['"""', "'''", '"', "'"]:
-                            if docstring_content.startswith(quote) and docstring_content.endswith(quote):
-                                docstring_content = docstring_content[len(quote):-len(quote)]
-                                break
-                        
-                        features.docstrings.append(docstring_content.strip())
-            
-            elif node_type == "function_definition":
-                func_name_node = node.child_by_field_name("name")
-                if func_name_node:
-                    features.function_names.append(
-                        code_bytes[func_name_node.start_byte:func_name_node.end_byte].decode("utf8")
-                    )
+    def _extract_python_features(self, node: Node, code_bytes: bytes, features: CodeFeatures,
+                                 mask: FeatureMask = FeatureMask.ALL):
+        query = self._queries.get('python')
+        if query is None:
+            return self._extract_generic_features(node, code_bytes, features, mask)
 
-            elif node_type == "class_definition":
-                class_name_node = node.child_by_field_name("name")
-                if class_name_node:
-                    features.class_names.append(
-                        code_bytes[class_name_node.start_byte:class_name_node.end_byte].decode("utf8")
-                    )
+        # memoryview slices are O(1), copy-free and hashable, so identifier
+        # spans dedup in the set without allocating bytes per occurrence;
+        # only the unique survivors get materialized and decoded below.
+        code_mv = memoryview(code_bytes)
 
-            elif node_type == "assignment":
-                target = node.child_by_field_name("left")
-                if target and target.type == "identifier":
-                    features.variable_names.append(
-                        code_bytes[target.start_byte:target.end_byte].decode("utf8")
-                    )
+        # Single automaton-driven walk collects every capture kind at once
+        captures = QueryCursor(query).captures(node)
 
-            elif node_type in ("import_statement", "import_from_statement"):
-                features.imports.append(node_text)
+        if mask & FeatureMask.NAMES:
+            for capture, target in (('fn', features.function_names),
+                                    ('cls', features.class_names),
+                                    ('var', features.variable_names)):
+                spans = {code_mv[n.start_byte:n.end_byte] for n in captures.get(capture, [])}
+                target.extend(bytes(span).decode("utf8") for span in spans)
 
-            elif node_type == "comment":
-                features.comments.append(node_text)
-                    
-            for child in node.children:
-                traverse(child)
-        
-        traverse(node)
-    
-    def _extract_js_ts_features(self, node: Node, code: str, features: CodeFeatures):
-        def traverse(node: Node):
-            code_bytes = code.encode("utf8")
-            node_type = node.type
-            node_text = code_bytes[node.start_byte:node.end_byte].decode("utf8")
-            
-            if node_type == 'string' or node_type == 'template_string':
-                features.strings.append(node_text)
-                
-                parent = node.parent
-                if (parent and parent.type == 'comment' and 
-                    node_text.strip().startswith('/**') and node_text.strip().endswith('*/')):
-                    
-                    docstring_content = node_text.strip()
-                    if docstring_content.startswith('/**') and docstring_content.endswith('*/'):
-                        docstring_content = docstring_content[3:-2].strip()
-                        features.docstrings.append(docstring_content)
-            
-            elif node_type == 'function_declaration' or node_type == 'function_expression':
-                name_node = node.child_by_field_name('name')
-                if name_node:
-                    features.function_names.append(
-                        code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
-                    )
-            
-            elif node_type == 'arrow_function':
-                parent = node.parent
-                if parent and parent.type == 'variable_declarator':
-                    name_node = parent.child_by_field_name('name')
-                    if name_node:
-                        features.function_names.append(
-                            code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
-                        )
-            
-            elif node_type == 'class_declaration':
-                name_node = node.child_by_field_name('name')
-                if name_node:
-                    features.class_names.append(
-                        code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
-                    )
-            
-            elif node_type == 'method_definition':
-                name_node = node.child_by_field_name('name')
-                if name_node:
-                    features.method_names.append(
-                        code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
-                    )
-            
-            elif node_type == 'variable_declarator':
-                name_node = node.child_by_field_name('name')
-                if name_node:
-                    features.variable_names.append(
-                        code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
-                    )
-            
-            elif node_type in ('import_statement', 'import_declaration'):
-                features.imports.append(node_text)
-            
-            elif node_type == 'comment':
-                features.comments.append(node_text)
-                
-                if node_text.strip().startswith('/**') and node_text.strip().endswith('*/'):
-                    docstring_content = node_text.strip()[3:-2].strip()
-                    if len(docstring_content) > 10:
-                        features.docstrings.append(docstring_content)
-            
-            for child in node.children:
-                traverse(child)
-        
-        traverse(node)
-    
-    def _extract_java_features(self, node: Node, code: str, features: CodeFeatures):
+        text_captures = []
+        if mask & FeatureMask.STRINGS:
+            text_captures.append(('str', features.strings))
+        if mask & FeatureMask.COMMENTS:
+            text_captures.append(('cmt', features.comments))
+        if mask & FeatureMask.IMPORTS:
+            text_captures.append(('imp', features.imports))
+        for capture, target in text_captures:
+            target.extend(
+                code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                for n in captures.get(capture, [])
+            )
+
+        if mask & FeatureMask.DOCSTRINGS:
+            for doc_node in captures.get('doc', []):
+                # The grammar's string_start/string_end children give the
+                # exact quote (and prefix) lengths, so stripping is a pure
+                # byte-slice — no quote-style matching at all
+                children = doc_node.children
+                if children and children[0].type == 'string_start' and children[-1].type == 'string_end':
+                    start = children[0].end_byte
+                    end = children[-1].start_byte
+                else:
+                    start = doc_node.start_byte
+                    end = doc_node.end_byte
+                features.docstrings.append(
+                    code_bytes[start:end].decode("utf8").strip()
+                )
+
+    def _extract_js_ts_features(self, node: Node, code_bytes: bytes, features: CodeFeatures,
+                                mask: FeatureMask = FeatureMask.ALL):
+        query = self._queries.get(features.language)
+        if query is None:
+            return self._extract_generic_features(node, code_bytes, features, mask)
+
+        captures = QueryCursor(query).captures(node)
+
+        if mask & FeatureMask.NAMES:
+            for capture, target in (('fn', features.function_names),
+                                    ('cls', features.class_names),
+                                    ('meth', features.method_names),
+                                    ('var', features.variable_names)):
+                target.extend(
+                    code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                    for n in captures.get(capture, ())
+                )
+
+        if mask & FeatureMask.STRINGS:
+            features.strings.extend(
+                code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                for n in captures.get('str', ())
+            )
+
+        if mask & FeatureMask.IMPORTS:
+            features.imports.extend(
+                code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                for n in captures.get('imp', ())
+            )
+
+        if mask & (FeatureMask.COMMENTS | FeatureMask.DOCSTRINGS):
+            for n in captures.get('cmt', ()):
+                node_text = code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                if mask & FeatureMask.COMMENTS:
+                    features.comments.append(node_text)
+                if mask & FeatureMask.DOCSTRINGS:
+                    stripped = node_text.strip()
+                    if stripped.startswith('/**') and stripped.endswith('*/'):
+                        docstring_content = stripped[3:-2].strip()
+                        if len(docstring_content) > 10:
+                            features.docstrings.append(docstring_content)
+
+    def _extract_java_features(self, node: Node, code_bytes: bytes, features: CodeFeatures,
+                               mask: FeatureMask = FeatureMask.ALL):
         """Extract Java features."""
-        def traverse(node: Node):
-            code_bytes = code.encode("utf8")
-            node_type = node.type
-            node_text = code_bytes[node.start_byte:node.end_byte].decode("utf8")
-            
-            if node_type == 'string_literal':
-                features.strings.append(node_text)
-            
-            elif node_type == 'method_declaration':
-                name_node = node.child_by_field_name('name')
-                if name_node:
-                    features.method_names.append(
-                        code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
-                    )
-            
-            elif node_type == 'class_declaration':
-                name_node = node.child_by_field_name('name')
-                if name_node:
-                    features.class_names.append(
-                        code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
-                    )
-            
-            elif node_type == 'variable_declarator':
-                name_node = node.child_by_field_name('name')
-                if name_node:
-                    features.variable_names.append(
-                        code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
-                    )
-            
-            elif node_type == 'import_declaration':
-                features.imports.append(node_text)
-            
-            elif node_type in ('line_comment', 'block_comment'):
-                features.comments.append(node_text)
-                
-                if node_type == 'block_comment' and node_text.strip().startswith('/**'):
-                    docstring_content = node_text.strip()
-                    if docstring_content.startswith('/**') and docstring_content.endswith('*/'):
-                        docstring_content = docstring_content[3:-2].strip()
+        query = self._queries.get('java')
+        if query is None:
+            return self._extract_generic_features(node, code_bytes, features, mask)
+
+        captures = QueryCursor(query).captures(node)
+
+        if mask & FeatureMask.NAMES:
+            for capture, target in (('meth', features.method_names),
+                                    ('cls', features.class_names),
+                                    ('var', features.variable_names)):
+                target.extend(
+                    code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                    for n in captures.get(capture, ())
+                )
+
+        if mask & FeatureMask.STRINGS:
+            features.strings.extend(
+                code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                for n in captures.get('str', ())
+            )
+
+        if mask & FeatureMask.IMPORTS:
+            features.imports.extend(
+                code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                for n in captures.get('imp', ())
+            )
+
+        if mask & FeatureMask.COMMENTS:
+            features.comments.extend(
+                code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                for n in captures.get('cmt', ())
+            )
+
+        # Block comments feed both buckets; Javadoc detection needs the text
+        if mask & (FeatureMask.COMMENTS | FeatureMask.DOCSTRINGS):
+            for n in captures.get('bcmt', ()):
+                node_text = code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                if mask & FeatureMask.COMMENTS:
+                    features.comments.append(node_text)
+                if mask & FeatureMask.DOCSTRINGS:
+                    stripped = node_text.strip()
+                    if stripped.startswith('/**') and stripped.endswith('*/'):
+                        docstring_content = stripped[3:-2].strip()
                         if len(docstring_content) > 10:
                             features.docstrings.append(docstring_content)
-            
-            for child in node.children:
-                traverse(child)
-        
-        traverse(node)
     
-    def _extract_c_cpp_features(self, node: Node, code: str, features: CodeFeatures):
+    def _extract_c_cpp_features(self, node: Node, code_bytes: bytes, features: CodeFeatures,
+                                mask: FeatureMask = FeatureMask.ALL):
         """Extract C/C++ features."""
-        def traverse(node: Node):
-            code_bytes = code.encode("utf8")
-            node_type = node.type
-            node_text = code_bytes[node.start_byte:node.end_byte].decode("utf8")
+        for n in _walk_tree(node, _SKIP_DESCEND['c']):
+            node_type = n.type
+            node_text = code_bytes[n.start_byte:n.end_byte].decode("utf8")
             
             if node_type == 'string_literal':
-                features.strings.append(node_text)
+                if mask & FeatureMask.STRINGS:
+                    features.strings.append(node_text)
             
-            elif node_type == 'function_definition':
-                declarator = node.child_by_field_name('declarator')
+            elif node_type == 'function_definition' and mask & FeatureMask.NAMES:
+                declarator = n.child_by_field_name('declarator')
                 if declarator and declarator.type == 'function_declarator':
                     name_node = declarator.child_by_field_name('declarator')
                     if name_node:
@@ -365,15 +760,15 @@ class TreeSitterExtractor:
                             code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                         )
             
-            elif node_type in ('class_specifier', 'struct_specifier'):
-                name_node = node.child_by_field_name('name')
+            elif node_type in ('class_specifier', 'struct_specifier') and mask & FeatureMask.NAMES:
+                name_node = n.child_by_field_name('name')
                 if name_node:
                     features.class_names.append(
                         code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                     )
             
-            elif node_type == 'declaration':
-                for child in node.children:
+            elif node_type == 'declaration' and mask & FeatureMask.NAMES:
+                for child in n.children:
                     if child.type == 'init_declarator':
                         declarator = child.child_by_field_name('declarator')
                         if declarator and declarator.type == 'identifier':
@@ -381,62 +776,49 @@ class TreeSitterExtractor:
                                 code_bytes[declarator.start_byte:declarator.end_byte].decode("utf8")
                             )
             
-            elif node_type in ('preproc_include', 'preproc_import'):
+            elif node_type in ('preproc_include', 'preproc_import') and mask & FeatureMask.IMPORTS:
                 features.imports.append(node_text)
             
             elif node_type == 'comment':
-                features.comments.append(node_text)
-                
-                # Check for Doxygen-style comments
-                if (node_text.strip().startswith('/**') or 
-                    node_text.strip().startswith('///') or
-                    node_text.strip().startswith('/*!')):
-                    
-                    docstring_content = node_text.strip()
-                    # Clean up different comment styles
-                    for prefix, suffix in [('/**', '*/'), ('/*！', '*/'), ('///', ''), ('//!', '')]:
-                        if docstring_content.startswith(prefix):
-                            if suffix and docstring_content.endswith(suffix):
-                                docstring_content = docstring_content[len(prefix):-len(suffix)]
-                            else:
-                                docstring_content = docstring_content[len(prefix):]
-                            break
-                    
-                    docstring_content = docstring_content.strip()
-                    if len(docstring_content) > 10:
-                        features.docstrings.append(docstring_content)
-            
-            for child in node.children:
-                traverse(child)
-        
-        traverse(node)
-    
-    def _extract_go_features(self, node: Node, code: str, features: CodeFeatures):
+                if mask & FeatureMask.COMMENTS:
+                    features.comments.append(node_text)
+
+                # Check for Doxygen-style comments; strip once and reuse
+                stripped = node_text.strip()
+                if (mask & FeatureMask.DOCSTRINGS) and stripped.startswith(_DOC_COMMENT_PREFIXES):
+                    match = _DOCSTRIP['c'].match(stripped)
+                    if match:
+                        docstring_content = match.group(1)
+                        if len(docstring_content) > 10:
+                            features.docstrings.append(docstring_content)
+
+    def _extract_go_features(self, node: Node, code_bytes: bytes, features: CodeFeatures,
+                             mask: FeatureMask = FeatureMask.ALL):
         """Extract Go features."""
-        def traverse(node: Node):
-            code_bytes = code.encode("utf8")
-            node_type = node.type
-            node_text = code_bytes[node.start_byte:node.end_byte].decode("utf8")
+        for n in _walk_tree(node, _SKIP_DESCEND['go']):
+            node_type = n.type
+            node_text = code_bytes[n.start_byte:n.end_byte].decode("utf8")
             
             if node_type in ('interpreted_string_literal', 'raw_string_literal'):
-                features.strings.append(node_text)
+                if mask & FeatureMask.STRINGS:
+                    features.strings.append(node_text)
             
-            elif node_type == 'function_declaration':
-                name_node = node.child_by_field_name('name')
+            elif node_type == 'function_declaration' and mask & FeatureMask.NAMES:
+                name_node = n.child_by_field_name('name')
                 if name_node:
                     features.function_names.append(
                         code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                     )
             
-            elif node_type == 'method_declaration':
-                name_node = node.child_by_field_name('name')
+            elif node_type == 'method_declaration' and mask & FeatureMask.NAMES:
+                name_node = n.child_by_field_name('name')
                 if name_node:
                     features.method_names.append(
                         code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                     )
             
-            elif node_type == 'type_declaration':
-                for child in node.children:
+            elif node_type == 'type_declaration' and mask & FeatureMask.NAMES:
+                for child in n.children:
                     if child.type == 'type_spec':
                         name_node = child.child_by_field_name('name')
                         if name_node:
@@ -444,8 +826,8 @@ class TreeSitterExtractor:
                                 code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                             )
             
-            elif node_type in ('var_declaration', 'short_var_declaration', 'const_declaration'):
-                for child in node.children:
+            elif node_type in ('var_declaration', 'short_var_declaration', 'const_declaration') and mask & FeatureMask.NAMES:
+                for child in n.children:
                     if child.type == 'var_spec' or child.type == 'const_spec':
                         for grandchild in child.children:
                             if grandchild.type == 'identifier':
@@ -460,307 +842,370 @@ class TreeSitterExtractor:
                                     code_bytes[expr.start_byte:expr.end_byte].decode("utf8")
                                 )
             
-            elif node_type == 'import_declaration':
+            elif node_type == 'import_declaration' and mask & FeatureMask.IMPORTS:
                 features.imports.append(node_text)
             
             elif node_type == 'comment':
-                features.comments.append(node_text)
-                
-                if node_text.strip().startswith('//'):
-                    next_sibling = node.next_sibling
-                    if (next_sibling and 
+                if mask & FeatureMask.COMMENTS:
+                    features.comments.append(node_text)
+
+                stripped = node_text.strip()
+                if (mask & FeatureMask.DOCSTRINGS) and stripped.startswith('//'):
+                    next_sibling = n.next_sibling
+                    if (next_sibling and
                         next_sibling.type in ['function_declaration', 'type_declaration', 'method_declaration']):
-                        
-                        docstring_content = node_text.strip()
-                        if docstring_content.startswith('//'):
-                            docstring_content = docstring_content[2:].strip()
-                            if len(docstring_content) > 10:
-                                features.docstrings.append(docstring_content)
-            
-            for child in node.children:
-                traverse(child)
-        
-        traverse(node)
+                        docstring_content = stripped[2:].strip()
+                        if len(docstring_content) > 10:
+                            features.docstrings.append(docstring_content)
     
-    def _extract_rust_features(self, node: Node, code: str, features: CodeFeatures):
+    def _extract_rust_features(self, node: Node, code_bytes: bytes, features: CodeFeatures,
+                               mask: FeatureMask = FeatureMask.ALL):
         """Extract Rust features."""
-        def traverse(node: Node):
-            code_bytes = code.encode("utf8")
-            node_type = node.type
-            node_text = code_bytes[node.start_byte:node.end_byte].decode("utf8")
+        for n in _walk_tree(node, _SKIP_DESCEND['rust']):
+            node_type = n.type
+            node_text = code_bytes[n.start_byte:n.end_byte].decode("utf8")
             
             if node_type == 'string_literal':
-                features.strings.append(node_text)
+                if mask & FeatureMask.STRINGS:
+                    features.strings.append(node_text)
             
-            elif node_type == 'function_item':
-                name_node = node.child_by_field_name('name')
+            elif node_type == 'function_item' and mask & FeatureMask.NAMES:
+                name_node = n.child_by_field_name('name')
                 if name_node:
                     features.function_names.append(
                         code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                     )
             
-            elif node_type in ('struct_item', 'enum_item', 'trait_item', 'impl_item'):
-                name_node = node.child_by_field_name('name')
+            elif node_type in ('struct_item', 'enum_item', 'trait_item', 'impl_item') and mask & FeatureMask.NAMES:
+                name_node = n.child_by_field_name('name')
                 if name_node:
                     features.class_names.append(
                         code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                     )
             
-            elif node_type == 'let_declaration':
-                pattern = node.child_by_field_name('pattern')
+            elif node_type == 'let_declaration' and mask & FeatureMask.NAMES:
+                pattern = n.child_by_field_name('pattern')
                 if pattern and pattern.type == 'identifier':
                     features.variable_names.append(
                         code_bytes[pattern.start_byte:pattern.end_byte].decode("utf8")
                     )
             
-            elif node_type in ('use_declaration', 'extern_crate_declaration'):
+            elif node_type in ('use_declaration', 'extern_crate_declaration') and mask & FeatureMask.IMPORTS:
                 features.imports.append(node_text)
             
             elif node_type in ('line_comment', 'block_comment'):
-                features.comments.append(node_text)
-                
-                # Check for Rust doc comments
-                if (node_text.strip().startswith('///') or 
-                    node_text.strip().startswith('//!') or
-                    node_text.strip().startswith('/**') or
-                    node_text.strip().startswith('/*!')):
-                    
-                    docstring_content = node_text.strip()
-                    for prefix, suffix in [('///', ''), ('//!', ''), ('/**', '*/'), ('/*!', '*/')]:
-                        if docstring_content.startswith(prefix):
-                            if suffix and docstring_content.endswith(suffix):
-                                docstring_content = docstring_content[len(prefix):-len(suffix)]
-                            else:
-                                docstring_content = docstring_content[len(prefix):]
-                            break
-                    
-                    docstring_content = docstring_content.strip()
-                    if len(docstring_content) > 10:
-                        features.docstrings.append(docstring_content)
-            
-            for child in node.children:
-                traverse(child)
-        
-        traverse(node)
+                if mask & FeatureMask.COMMENTS:
+                    features.comments.append(node_text)
+
+                # Check for Rust doc comments; strip once and reuse
+                stripped = node_text.strip()
+                if (mask & FeatureMask.DOCSTRINGS) and stripped.startswith(_DOC_COMMENT_PREFIXES):
+                    match = _DOCSTRIP['rust'].match(stripped)
+                    if match:
+                        docstring_content = match.group(1)
+                        if len(docstring_content) > 10:
+                            features.docstrings.append(docstring_content)
     
-    def _extract_ruby_features(self, node: Node, code: str, features: CodeFeatures):
+    def _extract_ruby_features(self, node: Node, code_bytes: bytes, features: CodeFeatures,
+                               mask: FeatureMask = FeatureMask.ALL):
         """Extract Ruby features.""" 
-        def traverse(node: Node):
-            code_bytes = code.encode("utf8")
-            node_type = node.type
-            node_text = code_bytes[node.start_byte:node.end_byte].decode("utf8")
+        for n in _walk_tree(node, _SKIP_DESCEND['ruby']):
+            node_type = n.type
+            node_text = code_bytes[n.start_byte:n.end_byte].decode("utf8")
             
             if node_type == 'string':
-                features.strings.append(node_text)
+                if mask & FeatureMask.STRINGS:
+                    features.strings.append(node_text)
             
-            elif node_type == 'method':
-                name_node = node.child_by_field_name('name')
+            elif node_type == 'method' and mask & FeatureMask.NAMES:
+                name_node = n.child_by_field_name('name')
                 if name_node:
                     features.method_names.append(
                         code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                     )
             
-            elif node_type == 'class':
-                name_node = node.child_by_field_name('name')
+            elif node_type == 'class' and mask & FeatureMask.NAMES:
+                name_node = n.child_by_field_name('name')
                 if name_node:
                     features.class_names.append(
                         code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                     )
             
-            elif node_type == 'module':
-                name_node = node.child_by_field_name('name')
+            elif node_type == 'module' and mask & FeatureMask.NAMES:
+                name_node = n.child_by_field_name('name')
                 if name_node:
                     features.class_names.append(
                         code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                     )
             
-            elif node_type == 'assignment':
-                left = node.child_by_field_name('left')
+            elif node_type == 'assignment' and mask & FeatureMask.NAMES:
+                left = n.child_by_field_name('left')
                 if left and left.type == 'identifier':
                     features.variable_names.append(
                         code_bytes[left.start_byte:left.end_byte].decode("utf8")
                     )
             
-            elif node_type in ('require', 'load', 'require_relative'):
+            elif node_type in ('require', 'load', 'require_relative') and mask & FeatureMask.IMPORTS:
                 features.imports.append(node_text)
             
             elif node_type == 'comment':
-                features.comments.append(node_text)
-                
+                if mask & FeatureMask.COMMENTS:
+                    features.comments.append(node_text)
+
                 # Check for YARD documentation comments (starting with ##)
-                if node_text.strip().startswith('#'):
+                stripped = node_text.strip()
+                if (mask & FeatureMask.DOCSTRINGS) and stripped.startswith('#'):
                     # Look for method/class documentation (comments directly before declarations)
-                    next_sibling = node.next_sibling
-                    if (next_sibling and 
+                    next_sibling = n.next_sibling
+                    if (next_sibling and
                         next_sibling.type in ['method', 'class', 'module']):
-                        
-                        docstring_content = node_text.strip()
-                        if docstring_content.startswith('#'):
-                            docstring_content = docstring_content[1:].strip()
-                            if len(docstring_content) > 10:
-                                features.docstrings.append(docstring_content)
-            
-            for child in node.children:
-                traverse(child)
-        
-        traverse(node)
+                        docstring_content = stripped[1:].strip()
+                        if len(docstring_content) > 10:
+                            features.docstrings.append(docstring_content)
     
-    def _extract_php_features(self, node: Node, code: str, features: CodeFeatures):
+    def _extract_php_features(self, node: Node, code_bytes: bytes, features: CodeFeatures,
+                              mask: FeatureMask = FeatureMask.ALL):
         """Extract PHP features."""
-        def traverse(node: Node):
-            code_bytes = code.encode("utf8")
-            node_type = node.type
-            node_text = code_bytes[node.start_byte:node.end_byte].decode("utf8")
+        for n in _walk_tree(node, _SKIP_DESCEND['php']):
+            node_type = n.type
+            node_text = code_bytes[n.start_byte:n.end_byte].decode("utf8")
             
             if node_type == 'string':
-                features.strings.append(node_text)
+                if mask & FeatureMask.STRINGS:
+                    features.strings.append(node_text)
             
-            elif node_type == 'function_definition':
-                name_node = node.child_by_field_name('name')
+            elif node_type == 'function_definition' and mask & FeatureMask.NAMES:
+                name_node = n.child_by_field_name('name')
                 if name_node:
                     features.function_names.append(
                         code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                     )
             
-            elif node_type == 'method_declaration':
-                name_node = node.child_by_field_name('name')
+            elif node_type == 'method_declaration' and mask & FeatureMask.NAMES:
+                name_node = n.child_by_field_name('name')
                 if name_node:
                     features.method_names.append(
                         code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                     )
             
-            elif node_type in ('class_declaration', 'interface_declaration', 'trait_declaration'):
-                name_node = node.child_by_field_name('name')
+            elif node_type in ('class_declaration', 'interface_declaration', 'trait_declaration') and mask & FeatureMask.NAMES:
+                name_node = n.child_by_field_name('name')
                 if name_node:
                     features.class_names.append(
                         code_bytes[name_node.start_byte:name_node.end_byte].decode("utf8")
                     )
             
-            elif node_type == 'assignment_expression':
-                left = node.child_by_field_name('left')
+            elif node_type == 'assignment_expression' and mask & FeatureMask.NAMES:
+                left = n.child_by_field_name('left')
                 if left and left.type == 'variable_name':
                     features.variable_names.append(
                         code_bytes[left.start_byte:left.end_byte].decode("utf8")
                     )
             
-            elif node_type in ('include_expression', 'require_expression', 'include_once_expression', 'require_once_expression'):
+            elif node_type in ('include_expression', 'require_expression', 'include_once_expression', 'require_once_expression') and mask & FeatureMask.IMPORTS:
                 features.imports.append(node_text)
             
             elif node_type == 'comment':
-                features.comments.append(node_text)
-                
-                # Check for PHPDoc comments
-                if (node_text.strip().startswith('/**') or 
-                    node_text.strip().startswith('/*')):
-                    
-                    docstring_content = node_text.strip()
-                    if docstring_content.startswith('/**') and docstring_content.endswith('*/'):
-                        docstring_content = docstring_content[3:-2].strip()
+                if mask & FeatureMask.COMMENTS:
+                    features.comments.append(node_text)
+
+                # Check for PHPDoc comments; strip once and reuse
+                stripped = node_text.strip()
+                if (mask & FeatureMask.DOCSTRINGS) and stripped.startswith('/*') and stripped.endswith('*/'):
+                    if stripped.startswith('/**'):
+                        docstring_content = stripped[3:-2].strip()
                         if len(docstring_content) > 10:
                             features.docstrings.append(docstring_content)
-                    elif docstring_content.startswith('/*') and docstring_content.endswith('*/'):
+                    else:
                         # Check if it looks like documentation
-                        content = docstring_content[2:-2].strip()
-                        if any(marker in content for marker in ['@param', '@return', '@throws', '@var', '@author']):
+                        content = stripped[2:-2].strip()
+                        if _DOC_TAG_RE.search(content):
                             features.docstrings.append(content)
-            
-            for child in node.children:
-                traverse(child)
-        
-        traverse(node)
     
-    def _extract_generic_features(self, node: Node, code: str, features: CodeFeatures):
+    def _extract_generic_features(self, node: Node, code_bytes: bytes, features: CodeFeatures,
+                                  mask: FeatureMask = FeatureMask.ALL):
         """For unsupported languages."""
-        def traverse(node: Node):
-            code_bytes = code.encode("utf8")
-            node_type = node.type
-            node_text = code_bytes[node.start_byte:node.end_byte].decode("utf8")
-            
-            # Extract strings
-            if 'string' in node_type:
-                features.strings.append(node_text)
-            
-            # Extract comments
-            elif 'comment' in node_type:
-                features.comments.append(node_text)
-            
-            # Extract identifiers as potential variable/function names
-            elif node_type == 'identifier' and len(node_text) > 1:
-                # Basic heuristic: longer identifiers are more likely to be meaningful
-                if len(node_text) > 3:
-                    features.variable_names.append(node_text)
-            
-            # Recursively process children
-            for child in node.children:
-                traverse(child)
-        
-        traverse(node)
+        query = self._generic_query(features.language)
+        if query is not None:
+            # C query engine surfaces only matching nodes; Python never
+            # touches the rest of the tree. One extend per bucket instead
+            # of a Python append per node.
+            captures = QueryCursor(query).captures(node)
+            if mask & FeatureMask.STRINGS:
+                features.strings.extend(
+                    code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                    for n in captures.get('str', ())
+                )
+            if mask & FeatureMask.COMMENTS:
+                features.comments.extend(
+                    code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                    for n in captures.get('cmt', ())
+                )
+            if mask & FeatureMask.NAMES:
+                # Identifiers repeat heavily (self, err, ...), so dedup while
+                # collecting instead of storing every occurrence; interning
+                # shares the survivors across files in the same process.
+                # Basic heuristic: longer identifiers are more likely to be
+                # meaningful. The byte span bounds the char length, so short
+                # identifiers are skipped before any slice or decode.
+                unique_ids = dict.fromkeys(
+                    code_bytes[n.start_byte:n.end_byte].decode("utf8")
+                    for n in captures.get('id', ())
+                    if n.end_byte - n.start_byte > 3
+                )
+                features.variable_names.extend(
+                    sys.intern(text) for text in unique_ids if len(text) > 3
+                )
+            return
+
+        # Cursor-walk fallback when no query could be built for this grammar.
+        # Matched byte ranges accumulate locally and are decoded in one
+        # extend per bucket after the walk.
+        string_ranges = []
+        comment_ranges = []
+        id_ranges = []
+        for n in _walk_tree(node):
+            node_type = n.type
+            if node_type in self._string_types:
+                string_ranges.append((n.start_byte, n.end_byte))
+            elif node_type in self._comment_types:
+                comment_ranges.append((n.start_byte, n.end_byte))
+            elif node_type == 'identifier':
+                # Byte span bounds the char length; skip short identifiers
+                # before any slice or decode
+                if n.end_byte - n.start_byte > 3:
+                    id_ranges.append((n.start_byte, n.end_byte))
+
+        if mask & FeatureMask.STRINGS:
+            features.strings.extend(code_bytes[s:e].decode("utf8") for s, e in string_ranges)
+        if mask & FeatureMask.COMMENTS:
+            features.comments.extend(code_bytes[s:e].decode("utf8") for s, e in comment_ranges)
+        if mask & FeatureMask.NAMES:
+            # Basic heuristic: longer identifiers are more likely to be meaningful
+            unique_ids = dict.fromkeys(code_bytes[s:e].decode("utf8") for s, e in id_ranges)
+            features.variable_names.extend(
+                sys.intern(text) for text in unique_ids if len(text) > 3
+            )
+
+    def _generic_query(self, language: str) -> Optional[Query]:
+        """Build (once per language) a query over whichever of the known
+        string/comment/identifier node types this grammar defines.
+
+        Unknown node types make a query fail to compile, so each candidate
+        pattern is probed individually and only the survivors are joined
+        into the cached query.
+        """
+        if language in self._generic_queries:
+            return self._generic_queries[language]
+
+        query = None
+        lang = self.languages.get(language)
+        if lang is not None:
+            patterns = []
+            candidates = (
+                [(t, 'str') for t in self._string_types]
+                + [(t, 'cmt') for t in self._comment_types]
+                + [('identifier', 'id')]
+            )
+            for type_name, capture in candidates:
+                snippet = f'({type_name}) @{capture}'
+                try:
+                    Query(lang, snippet)
+                except Exception:
+                    continue
+                patterns.append(snippet)
+            if patterns:
+                try:
+                    query = Query(lang, '\n'.join(patterns))
+                except Exception:
+                    query = None
+
+        self._generic_queries[language] = query
+        return query
     
-    def _fallback_extraction(self, code: str, language: str, file_path: Optional[str]) -> CodeFeatures:
+    def _fallback_extraction(self, code, language: str, file_path: Optional[str],
+                             mask: FeatureMask = FeatureMask.ALL) -> CodeFeatures:
         """Fallback regex-based extraction when Tree-sitter is not available."""
-        features = CodeFeatures(
-            strings=[],
-            function_names=[],
-            variable_names=[],
-            comments=[],
-            docstrings=[],
-            class_names=[],
-            method_names=[],
-            imports=[],
-            language=language,
-            file_path=file_path
-        )
-        
-        # Extract strings
-        string_patterns = [
-            r'"([^"\\]|\\.)*"',  # Double quoted
-            r"'([^'\\]|\\.)*'",  # Single quoted
-            r'`([^`\\]|\\.)*`'   # Backticks
-        ]
-        for pattern in string_patterns:
-            features.strings.extend(re.findall(pattern, code))
-        
-        # Extract comments
-        if language == 'python':
-            features.comments.extend(re.findall(r'#.*', code))
-            features.docstrings.extend(re.findall(r'"""(.*?)"""', code, re.DOTALL))
-            features.docstrings.extend(re.findall(r"'''(.*?)'''", code, re.DOTALL))
-        elif language in ['javascript', 'typescript', 'tsx', 'java', 'c', 'cpp', 'go', 'rust', 'php']:
-            features.comments.extend(re.findall(r'//.*', code))
-            features.comments.extend(re.findall(r'/\*(.*?)\*/', code, re.DOTALL))
-        
-        # Extract function/method names (basic patterns)
-        if language == 'python':
-            features.function_names.extend(re.findall(r'def\s+(\w+)', code))
-            features.class_names.extend(re.findall(r'class\s+(\w+)', code))
-        elif language in ['javascript', 'typescript', 'tsx']:
-            features.function_names.extend(re.findall(r'function\s+(\w+)', code))
-            features.class_names.extend(re.findall(r'class\s+(\w+)', code))
-        elif language == 'java':
-            features.method_names.extend(re.findall(r'(public|private|protected)?\s*(static)?\s*\w+\s+(\w+)\s*\(', code))
-            features.class_names.extend(re.findall(r'class\s+(\w+)', code))
-        
-        # Extract variable names (very basic)
-        if language == 'python':
-            features.variable_names.extend(re.findall(r'(\w+)\s*=', code))
-        
+        features = CodeFeatures(language=language, file_path=file_path)
+
+        # Single finditer pass over the combined alternation; lastgroup tells
+        # us which feature bucket the match belongs to. The scan runs over
+        # UTF-8 bytes and only matched slices are decoded.
+        code_b = code if isinstance(code, bytes) else code.encode('utf8')
+        pattern = _FALLBACK_COMBINED.get(language, _DEFAULT_COMBINED_RE)
+        for match in pattern.finditer(code_b):
+            kind = match.lastgroup
+            if kind:
+                bucket = _FALLBACK_BUCKETS[kind]
+                if mask & _BUCKET_MASK[bucket]:
+                    getattr(features, bucket).append(
+                        match.group(kind).decode('utf8', errors='replace')
+                    )
+
         return features
     
     def get_supported_languages(self) -> List[str]:
-        return list(self.parsers.keys())
+        return list(_LANG_TABLE.keys())
+
+    def extract_many(self, items: List[tuple], max_workers: Optional[int] = None) -> List[CodeFeatures]:
+        """Extract features for many (code, language, file_path) tuples.
+
+        Extraction is CPU-bound and independent per file, so batches fan
+        out to a process pool; each worker builds its own parsers lazily
+        via get_extractor() since tree-sitter objects don't pickle.
+        Chunked map amortizes the IPC cost per item.
+        """
+        if len(items) < 2:
+            return [_extract_one(item) for item in items]
+
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(_extract_one, items, chunksize=16))
+
+    def extract_from_files(self, paths: List[str], max_workers: Optional[int] = None) -> List[CodeFeatures]:
+        """Batch extract_features_from_path over a process pool.
+
+        Same fan-out model as extract_many, but each worker reads its own
+        files, so the parent never touches the sources at all.
+        """
+        if len(paths) < 2:
+            return [_extract_one_path(path) for path in paths]
+
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(_extract_one_path, paths, chunksize=16))
+
+
+# Module-level singleton so parsers and compiled queries are built once per
+# process instead of on every construction. Callers should prefer
+# get_extractor() over instantiating TreeSitterExtractor directly.
+_extractor: Optional[TreeSitterExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor() -> TreeSitterExtractor:
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = TreeSitterExtractor()
+    return _extractor
+
+
+def _extract_one(item: tuple) -> CodeFeatures:
+    """Worker entry for extract_many; module-level so it pickles."""
+    code, language, file_path = item
+    return get_extractor().extract_features(code, language, file_path)
+
+
+def _extract_one_path(path: str) -> CodeFeatures:
+    """Worker entry for extract_from_files; module-level so it pickles."""
+    return get_extractor().extract_features_from_path(path)
+
+
 
+# Field names resolved once from the dataclass so the dict builder can't
+# drift from the CodeFeatures layout
+_FEATURE_FIELDS = tuple(f.name for f in fields(CodeFeatures))
 
 
 def features_to_dict(features: CodeFeatures) -> Dict[str, Any]:
-    return {
-        'strings': features.strings,
-        'function_names': features.function_names,
-        'variable_names': features.variable_names,
-        'comments': features.comments,
-        'docstrings': features.docstrings,
-        'class_names': features.class_names,
-        'method_names': features.method_names,
-        'imports': features.imports,
-        'language': features.language,
-        'file_path': features.file_path,
-    }
+    return {name: getattr(features, name) for name in _FEATURE_FIELDS}
@@ -1,15 +1,142 @@
-import base64
+import asyncio
+import logging
+import os
 import re
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 from typing import List, Dict, Any, Optional, Tuple
-from github import Github, GithubException
+from github import Github
 from bs4 import BeautifulSoup
 import urllib.parse
+from collections import Counter, OrderedDict
 
 from app.config import settings
 from app.models import FileInfo
-from app.services.code_extractor import TreeSitterExtractor, CodeFeatures, features_to_dict
+from app.services.code_extractor import CodeFeatures, features_to_dict, get_extractor
 
+logger = logging.getLogger(__name__)
+
+# Parsed tree structures can run to multi-MB for monorepos; keep only
+# the hottest few since an ETag revalidation makes a miss cheap
+_TREE_CACHE_MAX = 8
+
+
+# Hoisted to module scope: built once, probed with rpartition instead of a
+# throwaway split list per file
+_LANG_EXT = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.jsx': 'JavaScript',
+    '.tsx': 'TypeScript',
+    '.java': 'Java',
+    '.cpp': 'C++',
+    '.c': 'C',
+    '.h': 'C/C++',
+    '.go': 'Go',
+    '.rs': 'Rust',
+    '.rb': 'Ruby',
+    '.php': 'PHP',
+    '.cs': 'C#',
+    '.swift': 'Swift',
+    '.kt': 'Kotlin',
+    '.scala': 'Scala',
+    '.r': 'R',
+    '.sql': 'SQL',
+    '.html': 'HTML',
+    '.css': 'CSS',
+    '.scss': 'SCSS',
+    '.less': 'LESS',
+    '.vue': 'Vue',
+    '.toml': 'TOML',
+    '.yaml': 'YAML',
+    '.yml': 'YAML',
+    '.json': 'JSON',
+    '.xml': 'XML'
+}
+
+_CODE_EXT = frozenset({
+    '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.h', '.hpp',
+    '.go', '.rs', '.rb', '.php', '.cs', '.swift', '.kt', '.scala', '.r',
+    '.sql', '.html', '.css', '.scss', '.less', '.vue', '.toml', '.yaml',
+    '.yml', '.json', '.xml', '.md', '.txt', '.sh', '.bat', '.ps1', '.pl',
+    '.lua', '.dart', '.ex', '.exs', '.elm', '.clj', '.cljs', '.hs', '.ml',
+    '.fs', '.vb', '.pas', '.asm', '.s', '.m', '.mm', '.gradle', '.pom',
+    '.cmake', '.make', '.dockerfile', '.tf', '.hcl', '.proto'
+})
+
+
+# One C-side findall over a newline-joined name blob replaces the
+# per-file Python loop in _detect_languages; the trailing \n anchors each
+# match to the final extension of a name
+_EXT_RE = re.compile(
+    r'\.(' + '|'.join(re.escape(ext[1:]) for ext in _LANG_EXT) + r')\n',
+    re.IGNORECASE,
+)
+
+# Compiled once; get_total_commits_count parses the Link header on every call
+_LAST_PAGE_RE = re.compile(r'<[^>]*page=(\d+)[^>]*>;\s*rel="last"')
+
+# One GraphQL round-trip replaces the per-commit detail GETs: history()
+# returns message/author/aggregate diff counters for the whole window and
+# costs a single rate-limit point instead of one per commit
+_COMMITS_QUERY = """
+query($owner: String!, $repo: String!, $ref: String!, $limit: Int!) {
+  repository(owner: $owner, name: $repo) {
+    ref(qualifiedName: $ref) {
+      target {
+        ... on Commit {
+          history(first: $limit) {
+            totalCount
+            nodes {
+              oid
+              message
+              author { name date }
+              additions
+              deletions
+              changedFilesIfAvailable
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+# Everything the analysis pipeline needs up front — commit window, README,
+# language sizes — in one GraphQL round-trip and one rate-limit point.
+# The recursive file tree stays on the Trees REST API (GraphQL cannot
+# expand a tree recursively), which get_repo_structure already caches.
+_BUNDLE_QUERY = """
+query($owner: String!, $repo: String!, $ref: String!, $limit: Int!,
+      $readmeMd: String!, $readmeLower: String!) {
+  repository(owner: $owner, name: $repo) {
+    ref(qualifiedName: $ref) {
+      target {
+        ... on Commit {
+          history(first: $limit) {
+            totalCount
+            nodes {
+              oid
+              message
+              author { name date }
+              additions
+              deletions
+              changedFilesIfAvailable
+            }
+          }
+        }
+      }
+    }
+    readmeMd: object(expression: $readmeMd) { ... on Blob { text } }
+    readmeLower: object(expression: $readmeLower) { ... on Blob { text } }
+    languages(first: 20) { edges { size node { name } } }
+  }
+}
+"""
 
 
 class GitHubService:
@@ -23,9 +150,76 @@ class GitHubService:
             self.github = Github()
             self.authenticated = False
         
-        self.session = requests.Session()
-        self.code_extractor = TreeSitterExtractor()  # Initialize code extractor
+        # Raw file content comes from raw.githubusercontent.com: no REST
+        # quota, no base64, and the async client lets fetches overlap. The
+        # semaphore keeps us a polite guest on the raw host.
+        self.http = httpx.AsyncClient(timeout=20.0, limits=httpx.Limits(max_connections=16))
+        self._fetch_semaphore = asyncio.Semaphore(8)
+        self.code_extractor = get_extractor()  # Parsers are shared process-wide
+        # tree-sitter releases the GIL while parsing and the extractor's
+        # parsers are thread-local, so a thread pool scales with cores
+        # without leaving the event loop blocked on CPU work
+        self._extract_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+        # (owner, repo, branch) -> (etag, parsed result); a 304 revalidation
+        # returns in milliseconds and costs no rate-limit quota. LRU-bounded
+        # at _TREE_CACHE_MAX so scanning many repos can't grow it unbounded.
+        self._tree_etag_cache: OrderedDict[Tuple[str, str, str], Tuple[str, Dict[str, Any]]] = OrderedDict()
+        # (owner, repo, branch) -> last seen head commit SHA; a ~200-byte
+        # branch probe decides whether the multi-MB recursive tree needs
+        # refetching at all
+        self._branch_sha_cache: Dict[Tuple[str, str, str], str] = {}
+        # Earliest time the next REST call may go out when the rate-limit
+        # budget runs low; responses already in hand are never delayed
+        self._rest_not_before = 0.0
     
+    async def _get_with_limits(self, url: str, **kwargs) -> httpx.Response:
+        """GET an api.github.com URL with rate-limit awareness.
+
+        Retries 403/429 with exponential backoff (honoring Retry-After),
+        and when the remaining budget runs low, defers the *next* request
+        until the reset window instead of burning calls that would fail
+        anyway — a response already received is returned immediately.
+        Waits are capped at 60s so a caller never stalls for a full quota
+        hour.
+        """
+        wait = self._rest_not_before - time.time()
+        if wait > 0:
+            print(f"Rate-limit budget low, holding request for {wait:.0f}s")
+            await asyncio.sleep(min(wait, 60.0))
+
+        delay = 1.0
+        response = None
+        for attempt in range(4):
+            response = await self.http.get(url, **kwargs)
+
+            if response.status_code in (403, 429):
+                if attempt == 3:
+                    break
+                retry_after = response.headers.get('Retry-After')
+                reset = response.headers.get('x-ratelimit-reset')
+                if retry_after:
+                    wait = min(float(retry_after), 60.0)
+                elif reset and response.headers.get('x-ratelimit-remaining') == '0':
+                    wait = min(max(int(reset) - time.time(), 0.0), 60.0)
+                else:
+                    wait = delay
+                print(f"Rate limited ({response.status_code}) on {url}, retrying in {wait:.0f}s")
+                await asyncio.sleep(wait)
+                delay = min(delay * 2, 60.0)
+                continue
+
+            remaining = int(response.headers.get('x-ratelimit-remaining', '9999'))
+            if remaining < 50:
+                reset = int(response.headers.get('x-ratelimit-reset', '0'))
+                if reset > time.time():
+                    print(f"Rate-limit budget low ({remaining} left), deferring further calls")
+                    self._rest_not_before = reset
+            else:
+                self._rest_not_before = 0.0
+            break
+        return response
+
     async def get_repo_structure(self, owner: str, repo: str, branch: str = "main") -> Dict[str, Any]:
         try:
             print(f"Getting repo structure for {owner}/{repo} on branch {branch}")
@@ -34,10 +228,37 @@ class GitHubService:
             headers = {}
             if settings.github_token:
                 headers['Authorization'] = f'token {settings.github_token}'
-            
-            response = self.session.get(url, headers=headers)
+
+            cache_key = (owner, repo, branch)
+            cached = self._tree_etag_cache.get(cache_key)
+            if cached:
+                self._tree_etag_cache.move_to_end(cache_key)
+            head_sha = None
+            if cached:
+                try:
+                    branch_response = await self._get_with_limits(
+                        f"https://api.github.com/repos/{owner}/{repo}/branches/{branch}",
+                        headers=headers
+                    )
+                    branch_response.raise_for_status()
+                    head_sha = branch_response.json()['commit']['sha']
+                except Exception as e:
+                    print(f"Branch probe failed for {owner}/{repo}: {e}")
+
+                if head_sha and self._branch_sha_cache.get(cache_key) == head_sha:
+                    print(f"Branch head unchanged for {owner}/{repo}, serving cached structure")
+                    return cached[1]
+
+                headers['If-None-Match'] = cached[0]
+
+            response = await self._get_with_limits(url, headers=headers)
+            if response.status_code == 304 and cached:
+                print(f"Tree unchanged for {owner}/{repo} (ETag hit)")
+                if head_sha:
+                    self._branch_sha_cache[cache_key] = head_sha
+                return cached[1]
             response.raise_for_status()
-            
+
             tree_data = response.json()
             
             files = []
@@ -45,14 +266,16 @@ class GitHubService:
                 if item['type'] == 'blob': 
                     download_url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{item['path']}"
                     
-                    file_info = FileInfo(
+                    # model_construct skips per-instance validation; the
+                    # fields come straight from the Trees API with known types
+                    file_info = FileInfo.model_construct(
                         path=item['path'],
-                        name=item['path'].split('/')[-1],
+                        name=item['path'].rpartition('/')[2],
                         size=item.get('size', 0),
                         download_url=download_url,
                         ignore=False,
                     )
-                    print(f'"{item['path']}", ',end="")
+                    logger.debug("tree entry: %s", item['path'])
                     files.append(file_info)
             
             print(f"Total files fetched: {len(files)}")
@@ -67,7 +290,7 @@ class GitHubService:
 
             
             
-            return {
+            result = {
                 "owner": owner,
                 "repo": repo,
                 "branch": branch,
@@ -76,19 +299,32 @@ class GitHubService:
                 "files": files,
                 "summary": structure,
             }
-            
-        except requests.exceptions.RequestException as e:
-            if hasattr(e, 'response') and e.response is not None:
-                if e.response.status_code == 403:
-                    print(f"GitHub API rate limit exceeded for {owner}/{repo}")
-                    return {"error": "GitHub API rate limit exceeded"}
-                elif e.response.status_code == 401:
-                    print(f"GitHub API authentication failed for {owner}/{repo}")
-                    return {"error": "GitHub API authentication failed"}
-                elif e.response.status_code == 404:
-                    print(f"Repository or branch not found for {owner}/{repo} on branch {branch}")
-                    return {"error": "Repository or branch not found"}
-            
+
+            etag = response.headers.get('ETag')
+            if etag:
+                self._tree_etag_cache[cache_key] = (etag, result)
+                self._tree_etag_cache.move_to_end(cache_key)
+                while len(self._tree_etag_cache) > _TREE_CACHE_MAX:
+                    self._tree_etag_cache.popitem(last=False)
+            if head_sha:
+                self._branch_sha_cache[cache_key] = head_sha
+
+            return result
+
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 403:
+                print(f"GitHub API rate limit exceeded for {owner}/{repo}")
+                return {"error": "GitHub API rate limit exceeded"}
+            elif e.response.status_code == 401:
+                print(f"GitHub API authentication failed for {owner}/{repo}")
+                return {"error": "GitHub API authentication failed"}
+            elif e.response.status_code == 404:
+                print(f"Repository or branch not found for {owner}/{repo} on branch {branch}")
+                return {"error": "Repository or branch not found"}
+
+            print(f"GitHub Trees API error for {owner}/{repo}")
+            return {"error": "GitHub API error" }
+        except httpx.HTTPError:
             print(f"GitHub Trees API error for {owner}/{repo}")
             return {"error": "GitHub API error" }
         except Exception as e:
@@ -99,107 +335,89 @@ class GitHubService:
     
     def _detect_languages(self, files: List[FileInfo]) -> Dict[str, int]:
         """Detect programming languages used in the repository"""
-        language_extensions = {
-            '.py': 'Python',
-            '.js': 'JavaScript',
-            '.ts': 'TypeScript',
-            '.jsx': 'JavaScript',
-            '.tsx': 'TypeScript',
-            '.java': 'Java',
-            '.cpp': 'C++',
-            '.c': 'C',
-            '.h': 'C/C++',
-            '.go': 'Go',
-            '.rs': 'Rust',
-            '.rb': 'Ruby',
-            '.php': 'PHP',
-            '.cs': 'C#',
-            '.swift': 'Swift',
-            '.kt': 'Kotlin',
-            '.scala': 'Scala',
-            '.r': 'R',
-            '.sql': 'SQL',
-            '.html': 'HTML',
-            '.css': 'CSS',
-            '.scss': 'SCSS',
-            '.less': 'LESS',
-            '.vue': 'Vue',
-            '.toml': 'TOML',
-            '.yaml': 'YAML',
-            '.yml': 'YAML',
-            '.json': 'JSON',
-            '.xml': 'XML'
-        }
-        
-        languages = {}
-        for file_info in files:
-            ext = '.' + file_info.name.split('.')[-1] if '.' in file_info.name else ''
-            if ext in language_extensions:
-                lang = language_extensions[ext]
-                languages[lang] = languages.get(lang, 0) + 1
-        
-        return languages
+        blob = '\n'.join(f.name for f in files) + '\n'
+        counts = Counter(
+            _LANG_EXT['.' + ext.lower()] for ext in _EXT_RE.findall(blob)
+        )
+        return dict(counts)
     
     
     async def download_file_content(self, owner: str, repo: str, file_path: str, branch: str = "main") -> Optional[str]:
-        code_extensions = {
-            '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.h', '.hpp',
-            '.go', '.rs', '.rb', '.php', '.cs', '.swift', '.kt', '.scala', '.r',
-            '.sql', '.html', '.css', '.scss', '.less', '.vue', '.toml', '.yaml',
-            '.yml', '.json', '.xml', '.md', '.txt', '.sh', '.bat', '.ps1', '.pl',
-            '.lua', '.dart', '.ex', '.exs', '.elm', '.clj', '.cljs', '.hs', '.ml',
-            '.fs', '.vb', '.pas', '.asm', '.s', '.m', '.mm', '.gradle', '.pom',
-            '.cmake', '.make', '.dockerfile', '.tf', '.hcl', '.proto'
-        }
-        
-        file_ext = '.' + file_path.split('.')[-1].lower() if '.' in file_path else ''
-        if file_ext not in code_extensions:
+        _, dot, tail = file_path.rpartition('.')
+        if not dot or '.' + tail.lower() not in _CODE_EXT:
             print(f"Skipping non-code file: {file_path}")
             return None
-            
+
+        raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{urllib.parse.quote(file_path)}"
+
         try:
-            repository = self.github.get_repo(f"{owner}/{repo}")
-            file_content = repository.get_contents(file_path, ref=branch)
-            return file_content.content
-                
-        except GithubException as e:
-            if e.status in [403, 401]:
-                print(f"GitHub API access issue, using fallback for {file_path}")
-                return {"error": "GitHub API access issue" }
-            else:
-                print(f"Failed to download file via API")
-                return {"error": "Failed to download file via API" }
+            async with self._fetch_semaphore:
+                response = await self.http.get(raw_url)
+
+            if response.status_code == 429:
+                retry_after = int(response.headers.get('Retry-After', '1'))
+                print(f"Rate limited on raw fetch, retrying {file_path} after {retry_after}s")
+                await asyncio.sleep(retry_after)
+                async with self._fetch_semaphore:
+                    response = await self.http.get(raw_url)
+
+            if response.status_code == 404:
+                print(f"File not found: {file_path}")
+                return None
+
+            response.raise_for_status()
+            return response.text
 
         except UnicodeDecodeError:
             print(f"Binary file detected, skipping content for {file_path}")
             return None
+        except httpx.HTTPError as e:
+            print(f"Failed to download {file_path}: {e}")
+            return {"error": "Failed to download file" }
         except Exception as e:
-            print(f"Unexpected error, trying fallback for {file_path}", str(e))
+            print(f"Unexpected error downloading {file_path}", str(e))
             return {"error": "Unexpected error" }
-    
+
+    async def download_many(self, owner: str, repo: str, file_paths: List[str], branch: str = "main") -> List[Optional[str]]:
+        """Fetch many files concurrently; order matches file_paths."""
+        return await asyncio.gather(*[
+            self.download_file_content(owner, repo, path, branch)
+            for path in file_paths
+        ])
+
+
     async def extract_code_features(self, owner: str, repo: str, file_path: str, branch: str = "main") -> Optional[Dict[str, Any]]:
         try:
             file_content = await self.download_file_content(owner, repo, file_path, branch)
             if not file_content or isinstance(file_content, dict):
                 return None
             
-            try:
-                decoded_content = base64.b64decode(file_content).decode('utf-8')
-            except Exception as e:
-                print(f"Failed to decode file content for {file_path}: {e}")
-                return None
-            
-            language = self.code_extractor.detect_language(file_path)
-            if not language:
+            loop = asyncio.get_running_loop()
+            features = await loop.run_in_executor(
+                self._extract_pool, self._extract_sync, file_content, file_path
+            )
+            if features is None:
                 print(f"Unsupported language for file: {file_path}")
-                return None
-            
-            features = self.code_extractor.extract_features(decoded_content, language, file_path)
-            return features_to_dict(features)
+            return features
             
         except Exception as e:
             print(f"Error extracting code features from {file_path}: {e}")
             return None
+
+    def _extract_sync(self, content: str, file_path: str) -> Optional[Dict[str, Any]]:
+        language = self.code_extractor.detect_language(file_path)
+        if not language:
+            return None
+        features = self.code_extractor.extract_features(content, language, file_path)
+        return features_to_dict(features)
+
+    async def extract_many(self, items: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """Extract features for (content, file_path) pairs across the thread pool."""
+        loop = asyncio.get_running_loop()
+        return list(await asyncio.gather(*[
+            loop.run_in_executor(self._extract_pool, self._extract_sync, content, path)
+            for content, path in items
+        ]))
     
     async def get_readme_content(self, owner: str, repo: str, branch: str = "main") -> Optional[str]:
         readme_files = [
@@ -210,32 +428,191 @@ class GitHubService:
         ]
         
         for readme_file in readme_files:
+            raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{readme_file}"
             try:
-                repository = self.github.get_repo(f"{owner}/{repo}")
-                print(f"Trying to fetch {readme_file} from {owner}/{repo}")
-                print(f'branch used: {branch}')
-                file_content = repository.get_contents(readme_file, ref=branch)
-                print(f"Found {readme_file} in {owner}/{repo}")
-                print(f'branch used: {branch}')
-                decoded_content = base64.b64decode(file_content.content).decode('utf-8')
-                return decoded_content
-                
-            except GithubException as e:
-                if e.status == 404:
+                print(f"Trying to fetch {readme_file} from {owner}/{repo} on branch {branch}")
+                response = await self.http.get(raw_url)
+                if response.status_code == 404:
                     print(f"{readme_file} not found, trying next option")
                     continue
-                else:
-                    print(f"GitHub API error fetching {readme_file}: {e}")
-                    continue
+                response.raise_for_status()
+                print(f"Found {readme_file} in {owner}/{repo}")
+                return response.text
+
+            except httpx.HTTPError as e:
+                print(f"Error fetching {readme_file}: {e}")
+                continue
             except Exception as e:
                 print(f"Error decoding {readme_file}: {e}")
                 continue
         
         return None
 
+    async def _graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self.http.post(
+            "https://api.github.com/graphql",
+            json={"query": query, "variables": variables},
+            headers={'Authorization': f'bearer {settings.github_token}'},
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get('errors'):
+            raise Exception(f"GraphQL query failed: {payload['errors']}")
+        return payload['data']
+
+    async def _fetch_commits_graphql(self, owner: str, repo: str, branch: str, limit: int) -> Dict[str, Any]:
+        print(f"Getting commits for {owner}/{repo} on branch {branch} via GraphQL")
+
+        data = await self._graphql(_COMMITS_QUERY, {
+            'owner': owner, 'repo': repo, 'ref': branch, 'limit': limit
+        })
+
+        ref = (data.get('repository') or {}).get('ref')
+        if not ref or not ref.get('target'):
+            raise Exception(f"Branch {branch} not found")
+
+        history = ref['target']['history']
+        nodes = history['nodes']
+        commits = []
+        for node in nodes:
+            author = node.get('author') or {}
+            commits.append({
+                'message': node['message'],
+                'author_name': author.get('name'),
+                'date': author.get('date'),
+                # GraphQL commits don't carry per-file patches; the
+                # aggregate counters cover what the analysis uses
+                'files_changed': [],
+                'total_additions': node.get('additions', 0),
+                'total_deletions': node.get('deletions', 0),
+                'total_files': node.get('changedFilesIfAvailable', 0)
+            })
+
+        # One compare call restores file-level detail for the whole window
+        # (up to 300 files) instead of one detail request per commit. The
+        # compare range cannot attribute files to individual commits, so the
+        # list rides alongside the commits.
+        files_changed = []
+        if nodes:
+            try:
+                files_changed = await self._compare_window(
+                    owner, repo, nodes[-1]['oid'], nodes[0]['oid']
+                )
+            except Exception as e:
+                print(f"Compare fetch failed for {owner}/{repo}: {e}")
+
+        return {
+            'owner': owner,
+            'repo': repo,
+            'branch': branch,
+            'commits': commits,
+            'files_changed': files_changed,
+            'total_commits': history['totalCount'],
+            'truncated': history['totalCount'] > limit
+        }
+
+    async def _compare_window(self, owner: str, repo: str, oldest_sha: str, newest_sha: str) -> List[Dict[str, Any]]:
+        headers = {}
+        if settings.github_token:
+            headers['Authorization'] = f'token {settings.github_token}'
+
+        url = f"https://api.github.com/repos/{owner}/{repo}/compare/{oldest_sha}^...{newest_sha}"
+        response = await self._get_with_limits(url, headers=headers)
+        response.raise_for_status()
+
+        return [
+            {
+                'filename': file_change['filename'],
+                'status': file_change['status'],
+                'additions': file_change.get('additions', 0),
+                'deletions': file_change.get('deletions', 0),
+                'changes': file_change.get('changes', 0)
+            }
+            for file_change in response.json().get('files', [])
+        ]
+
+    async def get_repo_bundle(self, owner: str, repo: str, branch: str = "main") -> Dict[str, Any]:
+        """Fetch commits, README and language sizes in one round-trip.
+
+        Authenticated callers pay a single GraphQL rate-limit point for
+        what used to be three endpoints; without a token this composes the
+        existing REST methods concurrently instead.
+        """
+        limit = 25
+
+        if not self.authenticated:
+            commits, readme = await asyncio.gather(
+                self.get_repository_commits(owner, repo, branch),
+                self.get_readme_content(owner, repo, branch),
+            )
+            return {
+                'owner': owner,
+                'repo': repo,
+                'branch': branch,
+                'commits': commits,
+                'readme': readme,
+                'languages': {},
+            }
+
+        data = await self._graphql(_BUNDLE_QUERY, {
+            'owner': owner, 'repo': repo, 'ref': branch, 'limit': limit,
+            'readmeMd': f'{branch}:README.md', 'readmeLower': f'{branch}:readme.md'
+        })
+
+        repository = data.get('repository') or {}
+
+        commits_result = {
+            'owner': owner, 'repo': repo, 'branch': branch,
+            'commits': [], 'files_changed': [], 'total_commits': 0, 'truncated': False
+        }
+        ref = repository.get('ref')
+        if ref and ref.get('target'):
+            history = ref['target']['history']
+            for node in history['nodes']:
+                author = node.get('author') or {}
+                commits_result['commits'].append({
+                    'message': node['message'],
+                    'author_name': author.get('name'),
+                    'date': author.get('date'),
+                    'files_changed': [],
+                    'total_additions': node.get('additions', 0),
+                    'total_deletions': node.get('deletions', 0),
+                    'total_files': node.get('changedFilesIfAvailable', 0)
+                })
+            commits_result['total_commits'] = history['totalCount']
+            commits_result['truncated'] = history['totalCount'] > limit
+
+        readme = None
+        for key in ('readmeMd', 'readmeLower'):
+            blob = repository.get(key)
+            if blob and blob.get('text'):
+                readme = blob['text']
+                break
+
+        languages = {
+            edge['node']['name']: edge['size']
+            for edge in (repository.get('languages') or {}).get('edges', [])
+        }
+
+        return {
+            'owner': owner,
+            'repo': repo,
+            'branch': branch,
+            'commits': commits_result,
+            'readme': readme,
+            'languages': languages,
+        }
+
     async def get_repository_commits(self, owner: str, repo: str, branch: str = "main", per_page: int = 100) -> Dict[str, Any]:
         limit = 25  # I want dont want to be spamming reqs on my key 😭
         truncated = False
+
+        if self.authenticated:
+            try:
+                return await self._fetch_commits_graphql(owner, repo, branch, limit)
+            except Exception as e:
+                print(f"GraphQL commits fetch failed for {owner}/{repo}, falling back to REST: {e}")
+
         try:
             print(f"Getting commits for {owner}/{repo} on branch {branch}")
             
@@ -249,20 +626,19 @@ class GitHubService:
                 'per_page': min(per_page, 100)  # GitHub API max is 100
             }
             
-            response = self.session.get(url, headers=headers, params=params)
+            response = await self._get_with_limits(url, headers=headers, params=params)
             response.raise_for_status()
             
             commits_data = response.json()
+
+            # Detail fetches overlap instead of paying one RTT per commit
+            shas = [c['sha'] for c in commits_data[:limit]]
+            detail_responses = await asyncio.gather(*[
+                self._get_with_limits(f"{url}/{sha}", headers=headers) for sha in shas
+            ])
+
             commits = []
-            
-            for i, commit_item in enumerate(commits_data):
-                if i >= limit:
-                    break
-                    
-                commit_sha = commit_item['sha']
-                commit_url = f"https://api.github.com/repos/{owner}/{repo}/commits/{commit_sha}"
-                
-                commit_response = self.session.get(commit_url, headers=headers)
+            for commit_response in detail_responses:
                 commit_response.raise_for_status()
                 commit_detail = commit_response.json()
                 
@@ -293,9 +669,8 @@ class GitHubService:
                 }
                 
                 commits.append(commit_info)
-            else:
-                if len(commits_data) > limit:
-                    truncated = True
+
+            truncated = len(commits_data) > limit
             
             return {
                 'owner': owner,
@@ -306,7 +681,7 @@ class GitHubService:
                 'truncated': truncated
             }
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"API request failed for {owner}/{repo}: {e}")
             raise Exception(f"Failed to fetch commits: {str(e)}")
         except Exception as e:
@@ -326,19 +701,19 @@ class GitHubService:
             if settings.github_token:
                 headers['Authorization'] = f'token {settings.github_token}'
             
-            response = self.session.head(url, params=params, headers=headers)
+            response = await self.http.head(url, params=params, headers=headers)
             response.raise_for_status()
             
             link_header = response.headers.get('Link')
             
             if not link_header:
-                get_response = self.session.get(url, params=params, headers=headers)
+                get_response = await self._get_with_limits(url, params=params, headers=headers)
                 get_response.raise_for_status()
                 commits_data = get_response.json()
                 total_commits = len(commits_data) if commits_data else 0
                 return total_commits
             
-            last_page_match = re.search(r'<[^>]*page=(\d+)[^>]*>;\s*rel="last"', link_header)
+            last_page_match = _LAST_PAGE_RE.search(link_header)
 
             if last_page_match:
                 total_commits = int(last_page_match.group(1))
@@ -346,9 +721,24 @@ class GitHubService:
             else:
                 return 1
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"API request failed for {owner}/{repo}: {e}")
             raise Exception(f"Failed to fetch commits count: {str(e)}")
         except Exception as e:
             print(f"Error getting commits count for {owner}/{repo}: {e}")
             raise Exception(f"Failed to get repository commits count: {str(e)}")
+
+
+_github_service: Optional[GitHubService] = None
+
+def get_github_service() -> GitHubService:
+    global _github_service
+    if _github_service is None:
+        _github_service = GitHubService()
+    return _github_service
+
+async def cleanup_github_service():
+    global _github_service
+    if _github_service:
+        await _github_service.http.aclose()
+        _github_service = None
@@ -1,154 +1,161 @@
 import json
-from typing import Dict, Any, List
+import time
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+# orjson serializes the 4-8 KB prompt payloads at C speed; stdlib json is
+# only a fallback so source-only installs keep working
+try:
+    import orjson
 
-class PromptTemplates:
-    @staticmethod
-    def readme_analysis_prompt(readme_content: str, repo_url: str) -> tuple[str, str]:
-        system_message = """
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(',', ':'))
+
+
+# The HUMAN/AI pattern rubric appeared verbatim in three system messages;
+# one canonical copy keeps the bytes identical across endpoints (which
+# also keeps any provider-side prompt caching effective) and edits in
+# one place
+_AI_HUMAN_PATTERNS = """HUMAN PATTERNS (lower AI probability 0.05-0.25):
+            - Natural imperfections: typos, informal grammar, inconsistent style
+            - Personal voice: use of "I think", "gonna", "pretty cool", casual contractions
+            - Direct and simple language: "Added this feature", "Fixed the bug"
+            - Authentic emotion: frustration or excitement: "finally got it working!", "this sucks"
+            - Technical but personal tone: "had issues with X, solved by doing Y"
+
+            AI PATTERNS (higher AI probability 0.70-0.95):
+            - Perfect grammar combined with a corporate tone
+            - Buzzword clusters: "comprehensive solution leveraging cutting-edge technology"
+            - Marketing speak: "showcasing expertise", "seamlessly integrates", "effortlessly optimizes"
+            - Structured lists with emoji bullets (e.g., ✅, 🎯, 🚀)
+            - Overuse of em dashes for emphasis—like this
+            - Generic and overly formal descriptions: "robust platform delivering exceptional results\""""
+
+@lru_cache(maxsize=1)
+def _today_cached(bucket: int) -> str:
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def _today() -> str:
+    """Today's date, re-formatted at most once per hour.
+
+    Several prompt builders stamp the current date; within one analysis
+    run they all get the same string without a strftime each.
+    """
+    return _today_cached(int(time.time()) // 3600)
+
+
+def _truncate_to_budget(items: List[Any], budget: int) -> List[Any]:
+    """Keep the leading items whose serialized form fits within budget.
+
+    Dumping a full commit or devlog list and slicing the string afterwards
+    serialized everything only to throw most of it away, and left broken
+    JSON at the cut point. Truncating the list first dumps only what the
+    prompt will actually carry.
+    """
+    kept: List[Any] = []
+    used = 2  # enclosing brackets
+    for item in items:
+        blob = _dumps(item)
+        if kept and used + len(blob) + 1 > budget:
+            break
+        kept.append(item)
+        used += len(blob) + 1
+    return kept
+
+
+def _windowed_excerpt(text: str, window: int = 2000, stride: int = 1800,
+                      max_windows: int = 4) -> str:
+    """Overlapping windows instead of a hard cut: long texts keep
+    contributing signal past the old truncation point, still in one call."""
+    windows = [text[i:i + window]
+               for i in range(0, max(len(text), 1), stride)][:max_windows]
+    if len(windows) > 1:
+        return "\n\n".join(
+            f"[window {n + 1}/{len(windows)}]\n{chunk}"
+            for n, chunk in enumerate(windows)
+        )
+    return windows[0] if windows else ""
+
+
+def _dump_capped(obj: Any, budget: int) -> str:
+    """Serialize obj to at most roughly budget characters of valid JSON.
+
+    Lists drop trailing items, dicts drop trailing keys; either way the
+    output stays parseable instead of being a string sliced mid-value.
+    """
+    if isinstance(obj, list):
+        return _dumps(_truncate_to_budget(obj, budget))
+    if isinstance(obj, dict):
+        blob = _dumps(obj)
+        if len(blob) <= budget:
+            return blob
+        kept: Dict[str, Any] = {}
+        used = 2
+        for key, value in obj.items():
+            entry = len(_dumps(key)) + len(_dumps(value)) + 2
+            if kept and used + entry > budget:
+                break
+            kept[key] = value
+            used += entry
+        return _dumps(kept)
+    return _dumps(obj)[:budget]
+
+
+# Control characters other than tab/newline/CR occasionally appear in
+# commit messages and confuse the model; translate() strips them in one
+# C-level pass per message
+_CTRL_TABLE = str.maketrans({chr(c): None for c in range(32) if c not in (9, 10, 13)})
+
+
+def _clean_messages(commits: List[Any], max_message: int = 500) -> List[Any]:
+    """Return commits with messages stripped of control characters and capped.
+
+    A single pathological commit message (vendored changelogs, squashed
+    bodies) can otherwise eat the whole serialization budget on its own.
+    """
+    cleaned = []
+    for commit in commits:
+        if isinstance(commit, dict) and isinstance(commit.get('message'), str):
+            commit = {**commit, 'message': commit['message'][:max_message].translate(_CTRL_TABLE)}
+        cleaned.append(commit)
+    return cleaned
+
+
+# System messages are multi-kilobyte literals identical on every call;
+# building them once at import avoids re-allocating them per prompt and
+# keeps each one a single shared string object
+_README_SYSTEM_MESSAGE = f"""
         You are an expert AI text detector. Your task is to analyze the provided text and determine the probability that it was written by an AI (0-100).
 
         Analyze the text for human vs AI patterns as described below:
 
-        HUMAN PATTERNS (lower AI probability 0.05-0.25):
-        - Natural imperfections: typos, informal grammar, inconsistent style
-        - Personal voice: use of "I think", "gonna", "pretty cool", casual contractions
-        - Direct and simple language: "Added this feature", "Fixed the bug"
-        - Authentic emotion: frustration or excitement: "finally got it working!", "this sucks"
-        - Technical but personal tone: "had issues with X, solved by doing Y"
-
-        AI PATTERNS (higher AI probability 0.70-0.95):
-        - Perfect grammar combined with a corporate tone
-        - Buzzword clusters: "comprehensive solution leveraging cutting-edge technology"
-        - Marketing speak: "showcasing expertise", "seamlessly integrates", "effortlessly optimizes"
-        - Structured lists with emoji bullets (e.g., ✅, 🎯, 🚀)
-        - Overuse of em dashes for emphasis—like this
-        - Generic and overly formal descriptions: "robust platform delivering exceptional results"
+        {_AI_HUMAN_PATTERNS}
 
-        Provide your answer as a number between 0 (definitely human) and 100 (definitely AI). return the probability and your reasoning in the following schema.
-        {
-        "probability": 0-100,
-        "reasoning": "detailed explanation of your assessment"
-        }
-
-        Provide a summary of the README content and a guess on its complexity between 0-100 (0=very simple, 100=very complex) and also provide why you rated it that way.
-        """
-        
-        user_prompt = f"""
-        Analyze this README from repository: {repo_url}
-        
-        README Content:
-        {readme_content[:4000]}
-        
         Provide your answer as a number between 0 (definitely human) and 100 (definitely AI). return the probability and your reasoning in the following schema.
         {{
         "probability": 0-100,
-        "reasoning": "detailed explanation of your assessment",
-        "complexity": 0-100,
-        "summary": "summary of the README content and its complexity"
+        "reasoning": "detailed explanation of your assessment"
         }}
-        """
-        
-        return system_message, user_prompt
-
 
-    @staticmethod
-    def file_selection_analysis_prompt(
-        file_descriptions: List[Dict],
-        repo_context: Dict[str, Any]
-    ) -> tuple[str, str]:
-        """
-        Generate prompt for file selection analysis
-        
-        Args:
-            file_descriptions: List of file description dictionaries
-            repo_context: Repository context information
-            
-        Returns:
-            Tuple of (system_message, user_prompt)
+        Provide a summary of the README content and a guess on its complexity between 0-100 (0=very simple, 100=very complex) and also provide why you rated it that way.
         """
-        system_message = """You are an expert software engineer analyzing GitHub repositories to identify important source files while excluding templates, boilerplate, and auto-generated content."""
-        
-        languages = ", ".join(repo_context.get("languages", {}).keys())
-        
-        user_prompt = f"""
-Analyze this GitHub repository and determine which files should be included in a selective download that excludes templates, boilerplate, auto-generated content, and other non-essential files.
-
-Repository Context:
-- Languages: {languages}
-- Total files: {repo_context.get('total_files', 0)}
 
-Files to analyze:
-{json.dumps(file_descriptions, indent=2)}
 
-Please provide your analysis in this exact JSON format:
-{{
-    "summary": {{
-        "primary_language": "detected primary programming language",
-        "project_type": "web app/library/tool/etc",
-        "architecture_pattern": "MVC/microservices/monolith/etc",
-        "key_insights": ["insight1", "insight2"]
-    }},
-    "files": [
-        {{
-            "path": "exact file path",
-            "include": true/false,
-            "confidence": 0.0-1.0,
-            "reason": "detailed reason for inclusion/exclusion"
-        }}
-    ]
-}}
+_FILESEL_SYSTEM_MESSAGE = """You are an expert software engineer analyzing GitHub repositories to identify important source files while excluding templates, boilerplate, and auto-generated content."""
 
-Focus on including:
-- Core source code files
-- Important configuration files (package.json, requirements.txt, etc.)
-- Key documentation (README, API docs)
-- Essential build files (Dockerfile, Makefile)
-- Database schemas and migrations
 
-Exclude:
-- Test files and test data
-- Build artifacts and compiled files
-- Auto-generated code (protobuf, swagger, etc.)
-- Template and boilerplate files
-- IDE configuration files
-- Dependency lock files (unless critical)
-- Log files and temporary files
-- Examples and samples (unless they're the main purpose)
-
-Be selective and prioritize files that demonstrate the actual implementation and architecture.
-"""
-        
-        return system_message, user_prompt
-
-    @staticmethod
-    def commits_analysis_prompt(
-        total_commits: int,
-        readme: Dict[str, Any],
-        commits_data: Dict[str, Any],
-        repo_info: Dict[str, Any]
-    ) -> tuple[str, str]:
-        system_message = """You are an expert software engineering analyst working for hackclub specializing in Git commit history analysis and fraud detection. 
+_COMMITS_SYSTEM_MESSAGE = f"""You are an expert software engineering analyst working for hackclub specializing in Git commit history analysis and fraud detection. 
         Your task is to analyze repository commits to identify fraudulent activity, AI vibe coded commits, etc.
         You will provide your analysis based on the commit messages, code edited in the commits, frequency of commits, and other metadata.
         
         Here are some general guidelines for your analysis:
         1. Look for the use of AI in the commit messages
-            HUMAN PATTERNS (lower AI probability 0.05-0.25):
-            - Natural imperfections: typos, informal grammar, inconsistent style
-            - Personal voice: use of "I think", "gonna", "pretty cool", casual contractions
-            - Direct and simple language: "Added this feature", "Fixed the bug"
-            - Authentic emotion: frustration or excitement: "finally got it working!", "this sucks"
-            - Technical but personal tone: "had issues with X, solved by doing Y"
-
-            AI PATTERNS (higher AI probability 0.70-0.95):
-            - Perfect grammar combined with a corporate tone
-            - Buzzword clusters: "comprehensive solution leveraging cutting-edge technology"
-            - Marketing speak: "showcasing expertise", "seamlessly integrates", "effortlessly optimizes"
-            - Structured lists with emoji bullets (e.g., ✅, 🎯, 🚀)
-            - Overuse of em dashes for emphasis—like this
-            - Generic and overly formal descriptions: "robust platform delivering exceptional results
+            {_AI_HUMAN_PATTERNS}
         2. Analyze amount of code changed and patterns to identify irregularities and possible fraud
             - Large commits with vague messages
             - Code changes that don't match the commit message
@@ -167,63 +174,15 @@ Be selective and prioritize files that demonstrate the actual implementation and
 
         Try not giving too much importance to the date of the commits, as some projects may have a burst of activity followed by long periods of inactivity.
         """
-        
-        user_prompt = f"""
-        Analyze the commit history for this repository:
-        
-        Repository: {repo_info.get('owner', 'unknown')}/{repo_info.get('repo', 'unknown')}
-        AI Summary of README: {readme.get('summary', 'N/A')}
-        Complexity of project (0-100): {readme.get('complexity', 'N/A')}
-        Branch: {repo_info.get('branch', 'main')}
 
-        Total commits: {total_commits}
-        Commits provided for analysis: {len(commits_data)}
-        
-        Commits:
-        {json.dumps(commits_data, indent=2)[:8000]}
-        
-        Current date: {datetime.now().strftime('%Y-%m-%d')}
-        Provide analysis in JSON format:
-        {{
-            "code_adequacy": 0-100, // How much the commits messages match the changes made in the code (0=not at all, 100=perfectly),
-            "repo_adequacy": 0-100, // How much the commits match the complexity of the project (0=not at all, 100=perfectly)
-            "ai": 0-100, // How much the commits seem to be written by AI (0=definitely human, 100=definitely AI)
-            "fraud": 0-100, // How much the project seem to be fraudulent(time inflating) (0=definitely not, 100=definitely yes)
-            "adequacy":0-100 // Overall adequacy (code + repo),
-            "reasoning": "detailed explanation of your assessment",
-            "red_flags": ["flag1", "flag2"]
-        }}
-        """
-        
-        return system_message, user_prompt
 
-    @staticmethod
-    def som_analysis_prompt(
-        readme: Dict[str, Any],
-        total_commits: int,
-        commits_data: Dict[str, Any],
-        som_info: Dict[str, Any]
-    ) -> tuple[str, str]:
-        system_message = """You are an expert software engineering analyst working for hackclub program Summer-of-making specializing in fraud detection and time-inflating. 
+_SOM_SYSTEM_MESSAGE = f"""You are an expert software engineering analyst working for hackclub program Summer-of-making specializing in fraud detection and time-inflating. 
         Your task is to analyze repository commits and the given SoM data to identify fraudulent activity, time-inflating, etc.
         You will provide your analysis based on the commit messages, code edited in the commits, frequency of commits, devlogs, time spent on each devlog and other metadata.
         
         Here are some general guidelines for your analysis:
         1. Look for the use of AI in the commit messages
-            HUMAN PATTERNS (lower AI probability 0.05-0.25):
-            - Natural imperfections: typos, informal grammar, inconsistent style
-            - Personal voice: use of "I think", "gonna", "pretty cool", casual contractions
-            - Direct and simple language: "Added this feature", "Fixed the bug"
-            - Authentic emotion: frustration or excitement: "finally got it working!", "this sucks"
-            - Technical but personal tone: "had issues with X, solved by doing Y"
-
-            AI PATTERNS (higher AI probability 0.70-0.95):
-            - Perfect grammar combined with a corporate tone
-            - Buzzword clusters: "comprehensive solution leveraging cutting-edge technology"
-            - Marketing speak: "showcasing expertise", "seamlessly integrates", "effortlessly optimizes"
-            - Structured lists with emoji bullets (e.g., ✅, 🎯, 🚀)
-            - Overuse of em dashes for emphasis—like this
-            - Generic and overly formal descriptions: "robust platform delivering exceptional results
+            {_AI_HUMAN_PATTERNS}
         2. Analyze amount of code changed and patterns to identify irregularities and possible fraud
             - Large commits with vague messages
             - Code changes that don't match the commit message
@@ -260,45 +219,8 @@ Be selective and prioritize files that demonstrate the actual implementation and
         Also give importance to the timestamps of the devlogs and commits to find correlations.
         """
 
-        user_prompt = f"""
-        Analyze for this project:
-        
-        AI Summary of README: {readme.get('summary', 'N/A')}
-
-        Total commits: {total_commits}
-        Commits provided for analysis: {len(commits_data)}
-        
-        Commits:
-        {json.dumps(commits_data, indent=2)[:8000]}
 
-        SoM data:
-        Project title: {som_info.get('title', 'N/A')}
-        Project description: {som_info.get('description', 'N/A')}
-        Total devlogs: {som_info.get('devlogs_count', 0)}
-        Devlogs:
-        {json.dumps(som_info.get('devlogs', []), indent=2)[:8000]}
-        
-        Current date: {datetime.now().strftime('%Y-%m-%d')}
-        Provide analysis in JSON format:
-        {{
-            "devlogs_adequacy": 0-100, // How much the commits match the devlogs of the project (0=not at all, 100=perfectly)
-            "ai_devlogs": 0-100, // How much the devlogs seem to be written by AI (0=definitely human, 100=definitely AI)
-            "fraud": 0-100, // How much the project seem to be fraudulent(time inflating) (0=definitely not, 100=definitely yes)
-            "adequacy":0-100 // Overall adequacy (How well everything matches),
-            "reasoning": "detailed explanation of your assessment",
-            "red_flags": ["flag1", "flag2"]
-        }}
-        """
-
-        return system_message, user_prompt
-    
-    @staticmethod
-    def repo_slopscore(
-        readme: Dict[str, Any],
-        repo_analysis: Dict[str, Any],
-        som_analysis: Dict[str, Any],        
-    ) -> tuple[str, str]:
-        system_message = """You are an expert software engineering analyst working for hackclub program Summer-of-making specializing in fraud detection and time-inflating. 
+_SLOPSCORE_SYSTEM_MESSAGE = """You are an expert software engineering analyst working for hackclub program Summer-of-making specializing in fraud detection and time-inflating. 
         Your task is to analyze the given repo analysis and som analysis to provide a final slopscore for the project also with the justification.
 
         Note that the use of AI does not mean that the project is fraudulent and increases the slopscore
@@ -308,33 +230,8 @@ Be selective and prioritize files that demonstrate the actual implementation and
         - A project is considered slop if it seems like AI vibe coded and seems like time-inflating or has no actual effort put into it
         """
 
-        user_prompt = f"""
-        Analyze for this project:
-        
-        AI Summary of README: {readme.get('summary', 'N/A')}
-        
-        Repo analysis:
-        {json.dumps(repo_analysis, indent=2)[:4000]}
-
-        SoM analysis:
-        {json.dumps(som_analysis, indent=2)[:4000]}
-        
-        Current date: {datetime.now().strftime('%Y-%m-%d')}
-        Provide analysis in JSON format:
-        {{
-            "slopscore": 0-100, // How much the project is slop (0=definitely not, 100=definitely yes)
-            "reasoning": "detailed explanation of your assessment"
-            "main_factors": ["factor1", "factor2"] // Main factors that influenced the slopscore (these factors should only be a few words(1-3) it will be shown at the top of the main reasoning)
-        }}
-        """
 
-        return system_message, user_prompt
-    
-    @staticmethod
-    def code_analysis_prompt(
-        code_features: List[Dict[str, Any]]
-    ) -> tuple[str, str]:
-        system_message = """
+_CODE_SYSTEM_MESSAGE = """
             You are an expert software engineering analyst working with the Hack Club *Summer of Making* program, specializing in detecting **AI-generated code**, **vibe-coded slop**, and **unused/dead code**.
 
             ---
@@ -412,13 +309,286 @@ Be selective and prioritize files that demonstrate the actual implementation and
             ```
         """
 
+
+_FILE_SELECTION_SYSTEM_MESSAGE = """You are an expert software engineering analyst working for hackclub program Summer-of-making specializing in fraud detection and time-inflating.
+        Your task is to select files that should be sent to a code analyzer from the repo to best represent the project while excluding templates, boilerplate, auto-generated content, and other non-essential files.
+
+        You are also given the readme analysis of the project which includes an AI summary of the readme and a guess on how complex the project is. Using this data, try to select files that will be valuable for the code analyzer to detect fraud and time-inflating.
+
+        Note: The files should be only be the code no config files, images, documentation, or other binary files.
+
+        The maximum number of files to select is given in the user message.
+        """
+
+
+_COMBINED_SYSTEM_MESSAGE = f"""
+        You are an expert AI text detector and software engineering analyst working for hackclub program Summer-of-making.
+        In a single pass you will (1) analyze the provided README and (2) select the files that should be sent to a code analyzer.
+
+        For the README, determine the probability that it was written by an AI (0-100) using these patterns:
+
+        {_AI_HUMAN_PATTERNS}
+
+        Also provide a summary of the README content and a guess on its complexity between 0-100 (0=very simple, 100=very complex).
+
+        For file selection, choose files that best represent the project for fraud and time-inflating detection while excluding templates, boilerplate, auto-generated content, config files, images, documentation, and other binary files.
+        """
+
+
+# Output-schema examples are static per endpoint; building them once at
+# import keeps the f-string bodies free of doubled braces and the bytes
+# identical call to call
+_COMMITS_SCHEMA_EXAMPLE = """{
+            "code_adequacy": 0-100, // How much the commits messages match the changes made in the code (0=not at all, 100=perfectly),
+            "repo_adequacy": 0-100, // How much the commits match the complexity of the project (0=not at all, 100=perfectly)
+            "ai": 0-100, // How much the commits seem to be written by AI (0=definitely human, 100=definitely AI)
+            "fraud": 0-100, // How much the project seem to be fraudulent(time inflating) (0=definitely not, 100=definitely yes)
+            "adequacy":0-100 // Overall adequacy (code + repo),
+            "reasoning": "detailed explanation of your assessment",
+            "red_flags": ["flag1", "flag2"]
+        }"""
+
+
+_SOM_SCHEMA_EXAMPLE = """{
+            "devlogs_adequacy": 0-100, // How much the commits match the devlogs of the project (0=not at all, 100=perfectly)
+            "ai_devlogs": 0-100, // How much the devlogs seem to be written by AI (0=definitely human, 100=definitely AI)
+            "fraud": 0-100, // How much the project seem to be fraudulent(time inflating) (0=definitely not, 100=definitely yes)
+            "adequacy":0-100 // Overall adequacy (How well everything matches),
+            "reasoning": "detailed explanation of your assessment",
+            "red_flags": ["flag1", "flag2"]
+        }"""
+
+
+class PromptTemplates:
+    @staticmethod
+    def readme_analysis_prompt(readme_content: str, repo_url: str) -> tuple[str, str]:
+        system_message = _README_SYSTEM_MESSAGE
+
+        readme_excerpt = _windowed_excerpt(readme_content)
+
         user_prompt = f"""
-        Analyze the following code features
+        Analyze this README from repository: {repo_url}
+
+        README Content (long READMEs are split into overlapping windows):
+        {readme_excerpt}
+
+        Provide your answer as a number between 0 (definitely human) and 100 (definitely AI). return the probability and your reasoning in the following schema.
+        {{
+        "probability": 0-100,
+        "reasoning": "detailed explanation of your assessment",
+        "complexity": 0-100,
+        "summary": "summary of the README content and its complexity"
+        }}
+        """
+
+        return system_message, user_prompt
+
+
+    @staticmethod
+    def file_selection_analysis_prompt(
+        file_descriptions: List[Dict],
+        repo_context: Dict[str, Any],
+        languages_str: Optional[str] = None
+    ) -> tuple[str, str]:
+        """
+        Generate prompt for file selection analysis
         
-        Code Features:
-        {json.dumps(code_features, indent=2)[:8000]}
+        Args:
+            file_descriptions: List of file description dictionaries
+            repo_context: Repository context information
+            
+        Returns:
+            Tuple of (system_message, user_prompt)
+        """
+        system_message = _FILESEL_SYSTEM_MESSAGE
+        
+        # Callers batching many prompts for one repo can pass the joined
+        # string once instead of re-walking the languages dict per call
+        if languages_str is None:
+            languages_str = ", ".join(repo_context.get("languages", {}).keys())
+        languages = languages_str
+        
+        user_prompt = f"""
+Analyze this GitHub repository and determine which files should be included in a selective download that excludes templates, boilerplate, auto-generated content, and other non-essential files.
+
+Repository Context:
+- Languages: {languages}
+- Total files: {repo_context.get('total_files', 0)}
+
+Files to analyze:
+{_dumps(file_descriptions)}
+
+Please provide your analysis in this exact JSON format:
+{{
+    "summary": {{
+        "primary_language": "detected primary programming language",
+        "project_type": "web app/library/tool/etc",
+        "architecture_pattern": "MVC/microservices/monolith/etc",
+        "key_insights": ["insight1", "insight2"]
+    }},
+    "files": [
+        {{
+            "path": "exact file path",
+            "include": true/false,
+            "confidence": 0.0-1.0,
+            "reason": "detailed reason for inclusion/exclusion"
+        }}
+    ]
+}}
+
+Focus on including:
+- Core source code files
+- Important configuration files (package.json, requirements.txt, etc.)
+- Key documentation (README, API docs)
+- Essential build files (Dockerfile, Makefile)
+- Database schemas and migrations
+
+Exclude:
+- Test files and test data
+- Build artifacts and compiled files
+- Auto-generated code (protobuf, swagger, etc.)
+- Template and boilerplate files
+- IDE configuration files
+- Dependency lock files (unless critical)
+- Log files and temporary files
+- Examples and samples (unless they're the main purpose)
+
+Be selective and prioritize files that demonstrate the actual implementation and architecture.
+"""
+        
+        return system_message, user_prompt
+
+    @staticmethod
+    def commits_analysis_prompt(
+        total_commits: int,
+        readme: Dict[str, Any],
+        commits_data: List[Dict[str, Any]],
+        repo_info: Dict[str, Any],
+        files_changed: Optional[List[Dict[str, Any]]] = None
+    ) -> tuple[str, str]:
+        system_message = _COMMITS_SYSTEM_MESSAGE
+
+        # Callers sometimes hand over the whole get_repository_commits()
+        # payload; unwrap it so the prompt carries commits, not dict keys
+        if isinstance(commits_data, dict):
+            commits_data = commits_data.get('commits', [])
+
+        # Static instructions and schema lead; repo data and commits trail
+        # so providers that cache common prompt prefixes get the longest
+        # possible shared region across repos
+        user_prompt = f"""
+        Analyze the commit history for this repository.
+
+        Provide analysis in JSON format:
+        {_COMMITS_SCHEMA_EXAMPLE}
+
+        Current date: {_today()}
 
-        Current date: {datetime.now().strftime('%Y-%m-%d')}
+        Repository: {repo_info.get('owner', 'unknown')}/{repo_info.get('repo', 'unknown')}
+        AI Summary of README: {readme.get('summary', 'N/A')}
+        Complexity of project (0-100): {readme.get('complexity', 'N/A')}
+        Branch: {repo_info.get('branch', 'main')}
+
+        Total commits: {total_commits}
+        Commits provided for analysis: {len(commits_data)}
+
+        Commits:
+        {_dumps(_truncate_to_budget(_clean_messages(commits_data), 8000))}
+        """
+
+        # The GraphQL commit path carries one file list for the whole
+        # window instead of per-commit patches; surface it so the model
+        # still sees which files the recent history touched
+        if files_changed:
+            user_prompt += f"""
+        Files changed across these commits (window-level, not per commit):
+        {_dumps(_truncate_to_budget(files_changed, 4000))}
+        """
+
+        return system_message, user_prompt
+
+    @staticmethod
+    def som_analysis_prompt(
+        readme: Dict[str, Any],
+        total_commits: int,
+        commits_data: List[Dict[str, Any]],
+        som_info: Dict[str, Any]
+    ) -> tuple[str, str]:
+        system_message = _SOM_SYSTEM_MESSAGE
+
+        if isinstance(commits_data, dict):
+            commits_data = commits_data.get('commits', [])
+
+        user_prompt = f"""
+        Analyze for this project.
+
+        Provide analysis in JSON format:
+        {_SOM_SCHEMA_EXAMPLE}
+
+        Current date: {_today()}
+
+        AI Summary of README: {readme.get('summary', 'N/A')}
+
+        Total commits: {total_commits}
+        Commits provided for analysis: {len(commits_data)}
+
+        Commits:
+        {_dumps(_truncate_to_budget(_clean_messages(commits_data), 8000))}
+
+        SoM data:
+        Project title: {som_info.get('title', 'N/A')}
+        Project description: {som_info.get('description', 'N/A')}
+        Total devlogs: {som_info.get('devlogs_count', 0)}
+        Devlogs:
+        {_dumps(_truncate_to_budget(som_info.get('devlogs', []), 8000))}
+        """
+
+        return system_message, user_prompt
+    
+    @staticmethod
+    def repo_slopscore(
+        readme: Dict[str, Any],
+        repo_analysis: Dict[str, Any],
+        som_analysis: Dict[str, Any],        
+    ) -> tuple[str, str]:
+        system_message = _SLOPSCORE_SYSTEM_MESSAGE
+
+        user_prompt = f"""
+        Analyze for this project.
+
+        Provide analysis in JSON format:
+        {{
+            "slopscore": 0-100, // How much the project is slop (0=definitely not, 100=definitely yes)
+            "reasoning": "detailed explanation of your assessment"
+            "main_factors": ["factor1", "factor2"] // Main factors that influenced the slopscore (these factors should only be a few words(1-3) it will be shown at the top of the main reasoning)
+        }}
+
+        Current date: {_today()}
+
+        AI Summary of README: {readme.get('summary', 'N/A')}
+
+        Repo analysis:
+        {_dump_capped(repo_analysis, 4000)}
+
+        SoM analysis:
+        {_dump_capped(som_analysis, 4000)}
+        """
+
+        return system_message, user_prompt
+    
+    @staticmethod
+    def code_analysis_prompt(
+        code_features: List[Dict[str, Any]]
+    ) -> tuple[str, str]:
+        system_message = _CODE_SYSTEM_MESSAGE
+
+        user_prompt = f"""
+        Analyze the following code features.
+
+        Current date: {_today()}
+
+        Code Features:
+        {_dumps(_truncate_to_budget(code_features, 8000))}
         """
 
         return system_message, user_prompt
@@ -429,27 +599,65 @@ Be selective and prioritize files that demonstrate the actual implementation and
         structure: Dict[str, Any],
         max_files: int = 25
     ) -> tuple[str, str]:
-        system_message = f"""You are an expert software engineering analyst working for hackclub program Summer-of-making specializing in fraud detection and time-inflating.
-        Your task is to select files that should be sent to a code analyzer from the repo to best represent the project while excluding templates, boilerplate, auto-generated content, and other non-essential files.
+        system_message = _FILE_SELECTION_SYSTEM_MESSAGE
 
-        You are also given the readme analysis of the project which includes an AI summary of the readme and a guess on how complex the project is. Using this data, try to select files that will be valuable for the code analyzer to detect fraud and time-inflating.
+        user_prompt = f"""
+        ONLY SELECT A MAXIMUM OF {max_files} FILES. If you think less files are needed, you can select less.
 
-        Note: The files should be only be the code no config files, images, documentation, or other binary files.
+        Provide analysis in JSON format:
+        {{
+            "selected_files": [ "file_path1", "file_path2", ...]
+        }}
 
-        ONLY SELECT A MAXIMUM OF {max_files} FILES. If you think less files are needed, you can select less.
-        """
+        Current date: {_today()}
 
-        user_prompt = f"""
         AI Summary of README: {readme.get('summary', 'N/A')}
-        
+
         Structure:
         {structure}
+        """
 
-        Current date: {datetime.now().strftime('%Y-%m-%d')}
-        Provide analysis in JSON format:
+        return system_message, user_prompt
+
+    @staticmethod
+    def combined_readme_file_selection(
+        readme_content: str,
+        repo_url: str,
+        structure: Dict[str, Any],
+        max_files: int = 20
+    ) -> tuple[str, str]:
+        """One prompt covering README analysis and file selection.
+
+        Fusing the two saves a full completion round-trip and sends the
+        shared context once instead of twice.
+        """
+        system_message = _COMBINED_SYSTEM_MESSAGE
+
+        readme_excerpt = _windowed_excerpt(readme_content)
+
+        user_prompt = f"""
+        Analyze this repository: {repo_url}
+
+        Provide your answer in this exact JSON format:
         {{
+            "readme_analysis": {{
+                "probability": 0-100,
+                "reasoning": "detailed explanation of your assessment",
+                "complexity": 0-100,
+                "summary": "summary of the README content and its complexity"
+            }},
             "selected_files": [ "file_path1", "file_path2", ...]
         }}
+
+        ONLY SELECT A MAXIMUM OF {max_files} FILES. If you think less files are needed, you can select less.
+
+        Current date: {_today()}
+
+        README Content (long READMEs are split into overlapping windows):
+        {readme_excerpt}
+
+        Structure:
+        {structure}
         """
 
         return system_message, user_prompt
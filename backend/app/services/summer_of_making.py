@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 from typing import Dict, Optional, Any
 from app.config import settings
@@ -17,15 +18,32 @@ class SummerOfMakingService:
         }
         
         self.client = httpx.AsyncClient(
-            timeout=30.0,
+            timeout=httpx.Timeout(30.0, connect=5.0),
             headers=headers,
-            follow_redirects=True
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=50,
+                max_keepalive_connections=10,
+                keepalive_expiry=60.0
+            )
         )
-    
+
+        # Concurrent requests for the same project share one upstream
+        # fetch instead of each hitting the API
+        self._inflight: Dict[int, asyncio.Task] = {}
+
     async def close(self):
         await self.client.aclose()
-    
+
     async def get_project_data(self, project_id: int) -> Optional[Dict[str, Any]]:
+        task = self._inflight.get(project_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_project_data(project_id))
+            self._inflight[project_id] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(project_id, None))
+        return await task
+
+    async def _fetch_project_data(self, project_id: int) -> Optional[Dict[str, Any]]:
         try:
             url = f"{self.BASE_URL}/v2/projects/{project_id}"
             
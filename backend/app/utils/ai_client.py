@@ -2,18 +2,72 @@
 AI Client utility for Hack Club AI service
 Provides a simple interface for sending prompts and getting responses
 """
+import asyncio
 import httpx
+import random
 from typing import Optional, Dict, Any, List
 import json
 from app.config import settings
 
+# orjson parses and serializes payloads at C speed; stdlib json is only
+# a fallback so source-only installs keep working
+try:
+    import orjson
+
+    def _json_loads(data: Any) -> Any:
+        return orjson.loads(data)
+
+    def _json_dump_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _json_loads(data: Any) -> Any:
+        return json.loads(data)
+
+    def _json_dump_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+_RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Backoff with jitter, stretched to honor an upstream Retry-After"""
+    delay = min(2 ** attempt, 30) + random.uniform(0, 0.5)
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return min(delay, 60.0)
+
 
 class HackClubAIClient:
     """Client for interacting with Hack Club AI service"""
     
     def __init__(self):
         self.base_url = "https://ai.hackclub.com"
-        self.client = httpx.AsyncClient(timeout=60.0)
+        # Parsed once; httpx re-parses string URLs on every request
+        self._completions_url = httpx.URL(f"{self.base_url}/chat/completions")
+        # Keep-alive pool so repeat prompts reuse warm connections
+        # instead of paying a TLS handshake each call
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=30.0
+            )
+        )
+        # Bound in-flight requests so wide fan-outs queue here instead
+        # of triggering upstream 429s
+        self._request_sem = asyncio.BoundedSemaphore(settings.ai_max_concurrency)
+
+    async def close(self):
+        """Close the underlying HTTP connection pool"""
+        await self.client.aclose()
     
     async def chat_completion(
         self,
@@ -21,18 +75,20 @@ class HackClubAIClient:
         model: str = "llama-3.1-8b-instant",
         temperature: float = 0.7,
         max_tokens: int = 1000,
-        stream: bool = False
+        stream: bool = False,
+        response_format: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
         Send a chat completion request to Hack Club AI
-        
+
         Args:
             messages: List of message objects with 'role' and 'content'
             model: Model to use for completion
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens to generate
             stream: Whether to stream the response
-            
+            response_format: Optional format constraint, e.g. {"type": "json_object"}
+
         Returns:
             Dict containing the AI response
         """
@@ -44,20 +100,68 @@ class HackClubAIClient:
                 "max_tokens": max_tokens,
                 "stream": stream
             }
+            if response_format is not None:
+                payload["response_format"] = response_format
             
-            response = await self.client.post(
-                f"{self.base_url}/chat/completions",
-                headers={"Content-Type": "application/json"},
-                json=payload
-            )
-            response.raise_for_status()
-            
-            return response.json()
-            
+            if stream:
+                return await self._stream_completion(payload)
+
+            # Retry transient failures instead of failing the whole
+            # analysis pipeline on one hiccup
+            body = _json_dump_bytes(payload)
+            for attempt in range(3):
+                try:
+                    async with self._request_sem:
+                        response = await self.client.post(
+                            self._completions_url,
+                            content=body,
+                            headers=_JSON_HEADERS
+                        )
+                    if response.status_code in _RETRYABLE_STATUSES and attempt < 2:
+                        await asyncio.sleep(_retry_delay(response, attempt))
+                        continue
+                    response.raise_for_status()
+                    return _json_loads(response.content)
+                except httpx.TransportError:
+                    if attempt == 2:
+                        raise
+                    await asyncio.sleep(0.2 * (2 ** attempt) + random.uniform(0, 0.1))
+
         except httpx.HTTPError as e:
             raise Exception(f"HTTP error occurred: {e}")
         except Exception as e:
             raise Exception(f"Error in AI request: {e}")
+
+    async def _stream_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Consume an SSE completion stream into a chat_completion-shaped dict
+
+        Content deltas are accumulated as they arrive instead of buffering
+        the whole response body before parsing.
+        """
+        parts: List[str] = []
+        async with self._request_sem:
+            async with self.client.stream(
+                "POST",
+                self._completions_url,
+                content=_json_dump_bytes(payload),
+                headers=_JSON_HEADERS
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = _json_loads(data)
+                    except json.JSONDecodeError:
+                        continue
+                    choices = chunk.get("choices")
+                    if choices and choices[0].get("delta", {}).get("content"):
+                        parts.append(choices[0]["delta"]["content"])
+        return {"choices": [{"message": {"content": "".join(parts)}}]}
     
     async def simple_prompt(
         self,
@@ -65,34 +169,37 @@ class HackClubAIClient:
         system_message: Optional[str] = None,
         model: str = "llama-3.1-8b-instant",
         temperature: float = 0.7,
-        max_tokens: int = 1000
+        max_tokens: int = 1000,
+        response_format: Optional[Dict[str, str]] = None
     ) -> str:
         """
         Send a simple prompt and get the response content
-        
+
         Args:
             prompt: The user prompt
             system_message: Optional system message to set context
             model: Model to use
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
-            
+            response_format: Optional format constraint, e.g. {"type": "json_object"}
+
         Returns:
             The AI response content as a string
         """
         messages = []
-        
+
         if system_message:
             messages.append({"role": "system", "content": system_message})
-        
+
         messages.append({"role": "user", "content": prompt})
-        
+
         try:
             response = await self.chat_completion(
                 messages=messages,
                 model=model,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                response_format=response_format
             )
             
             # Extract content from response